@@ -0,0 +1,217 @@
+"""Load-test the API in-process against synthetic artifacts at several catalog sizes.
+
+Each size runs in its own subprocess: synthetic metadata, neighbor/collaborative
+indexes, features and user data are written to a temporary data dir (the
+local cache ``s3_load`` reads before touching S3), the app is started with its
+lifespan, and concurrent clients drive it through httpx's ASGI transport.
+Throughput and p50/p95/p99 latency per endpoint are written to a JSON report
+that can be diffed across commits.
+
+Usage: PYTHONPATH=src python benchmarks/bench_api_load.py --sizes 1000 10000 50000 --concurrency 16
+Requires httpx (installed with the dev extras).
+"""
+
+import argparse
+import asyncio
+from datetime import datetime
+import json
+import os
+from pathlib import Path
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from synthetic import make_features, make_metadata, make_neighbor_index, make_user_features
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+ENDPOINTS = ("recommendations", "batch", "users")
+
+
+def write_artifacts(data_dir: Path, n_items: int, n_users: int, seed: int) -> dict:
+    """Write every artifact the API loads where ``s3_load`` looks for cached files."""
+    from manga_recs.common.constants import (
+        CLEANED_MANGA_METADATA_PARQUET,
+        COLLAB_INDEX_FILENAME,
+        MANGA_FEATURES_FILENAME,
+        NEIGHBOR_INDEX_FILENAME,
+        USER_FEATURES_PARQUET,
+    )
+
+    for status in ("cleaned", "features", "models"):
+        (data_dir / status).mkdir(parents=True, exist_ok=True)
+
+    metadata = make_metadata(n_items, seed=seed)
+    ids = metadata['id'].to_numpy()
+    metadata.to_parquet(data_dir / "cleaned" / CLEANED_MANGA_METADATA_PARQUET)
+    make_features(ids, seed=seed).save(data_dir / "features" / MANGA_FEATURES_FILENAME)
+    user_features = make_user_features(ids, n_users=n_users, seed=seed)
+    user_features.to_parquet(data_dir / "features" / USER_FEATURES_PARQUET)
+    make_neighbor_index(ids, seed=seed).save(data_dir / "models" / NEIGHBOR_INDEX_FILENAME)
+    make_neighbor_index(ids, seed=seed + 1).save(data_dir / "models" / COLLAB_INDEX_FILENAME)
+
+    return {
+        "titles": metadata['title'].tolist(),
+        "ids": ids.tolist(),
+        "users": user_features['userId'].unique().tolist(),
+    }
+
+
+def summarize(latencies: list[float], errors: int, elapsed: float) -> dict:
+    latencies_ms = np.array(latencies) * 1000
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput_rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(float(np.percentile(latencies_ms, 50)), 3),
+        "p95_ms": round(float(np.percentile(latencies_ms, 95)), 3),
+        "p99_ms": round(float(np.percentile(latencies_ms, 99)), 3),
+    }
+
+
+async def drive(client, make_request, n_requests: int, concurrency: int) -> dict:
+    """Send ``n_requests`` from ``concurrency`` clients; ``make_request(i)`` returns (method, url, json)."""
+    latencies: list[float] = []
+    errors = 0
+    next_request = iter(range(n_requests))
+
+    async def worker():
+        nonlocal errors
+        for i in next_request:
+            method, url, body = make_request(i)
+            started = time.perf_counter()
+            response = await client.request(method, url, json=body)
+            latencies.append(time.perf_counter() - started)
+            errors += response.status_code != 200
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, errors, time.perf_counter() - started)
+
+
+async def run_size(args, catalog: dict) -> dict:
+    import httpx
+
+    from manga_recs.api.main import MODEL_STORE, app
+
+    rng = np.random.default_rng(args.seed)
+    titles = rng.choice(catalog["titles"], size=args.requests).tolist()
+    ids = rng.choice(catalog["ids"], size=(args.requests, args.batch_size)).tolist()
+    users = rng.choice(catalog["users"], size=args.requests).tolist()
+    requests = {
+        "recommendations": lambda i: ("POST", "/recommendations/", {"title": titles[i], "top_n": args.top_n}),
+        "batch": lambda i: ("POST", "/recommendations/batch", {"ids": ids[i], "top_n": args.top_n}),
+        "users": lambda i: ("GET", f"/users/{users[i]}/recommendations?top_n={args.top_n}", None),
+    }
+
+    async with app.router.lifespan_context(app):
+        started = time.perf_counter()
+        while not MODEL_STORE.loaded:
+            if MODEL_STORE.load_error:
+                raise RuntimeError(MODEL_STORE.load_error)
+            await asyncio.sleep(0.05)
+        load_seconds = time.perf_counter() - started
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            results = {}
+            for endpoint in args.endpoints:
+                await drive(client, requests[endpoint], min(args.warmup, args.requests), args.concurrency)
+                results[endpoint] = await drive(client, requests[endpoint], args.requests, args.concurrency)
+
+    return {"items": args.items, "load_s": round(load_seconds, 3), "endpoints": results}
+
+
+def worker_main(args) -> None:
+    """Generate artifacts for one size, point the settings at them, and run the load."""
+    with tempfile.TemporaryDirectory(prefix="manga-recs-bench-") as tmp:
+        data_dir = Path(tmp) / "data"
+
+        # Point the settings at the temp dir before anything imports them
+        config = Path(tmp) / "bench.toml"
+        config.write_text(
+            f'[paths]\ndata_dir = "{data_dir.as_posix()}"\n'
+            f'[api]\nmodel_refresh_interval = 0\nresponse_cache_size = {args.cache_size}\n'
+            f'max_batch_size = {max(args.batch_size, 1)}\n'
+            f'[recommendation]\nengine = "{args.engine}"\n'
+        )
+        os.environ["MANGA_RECS_CONFIG"] = str(config)
+
+        catalog = write_artifacts(data_dir, args.items, args.users, args.seed)
+
+        result = asyncio.run(run_size(args, catalog))
+    # The last stdout line is the result; everything above is load logging
+    print(json.dumps(result))
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 50_000])
+    parser.add_argument("--endpoints", nargs="+", choices=ENDPOINTS, default=list(ENDPOINTS))
+    parser.add_argument("--engine", choices=("neighbors", "vector"), default="neighbors")
+    parser.add_argument("--requests", type=int, default=2_000, help="Requests per endpoint")
+    parser.add_argument("--warmup", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--top-n", type=int, default=10)
+    parser.add_argument("--batch-size", type=int, default=10)
+    parser.add_argument("--users", type=int, default=1_000)
+    parser.add_argument("--cache-size", type=int, default=0, help="Response cache size (0 measures uncached work)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path, default=REPO_ROOT / "benchmarks" / "results" / "api_load.json")
+    parser.add_argument("--items", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        worker_main(args)
+        return
+
+    # One subprocess per size: settings are read once per process at import
+    passthrough = [arg for arg in sys.argv[1:] if arg != "--worker"]
+    runs = []
+    for n_items in args.sizes:
+        print(f"Benchmarking {n_items} items...")
+        completed = subprocess.run(
+            [sys.executable, __file__, *passthrough, "--worker", "--items", str(n_items)],
+            cwd=REPO_ROOT,
+            capture_output=True,
+            text=True,
+        )
+        if completed.returncode != 0:
+            sys.exit(f"Benchmark for {n_items} items failed:\n{completed.stderr}")
+        run = json.loads(completed.stdout.strip().splitlines()[-1])
+        runs.append(run)
+        for endpoint, stats in run["endpoints"].items():
+            print(
+                f"  {endpoint:<16} {stats['throughput_rps']:>8.1f} req/s  "
+                f"p50={stats['p50_ms']:.2f}ms p95={stats['p95_ms']:.2f}ms p99={stats['p99_ms']:.2f}ms "
+                f"errors={stats['errors']}"
+            )
+
+    report = {
+        "commit": git_commit(),
+        "created_at": datetime.now().strftime("%Y-%m-%dT%H:%M:%S"),
+        "config": {
+            key: getattr(args, key)
+            for key in ("engine", "requests", "concurrency", "top_n", "batch_size", "users", "cache_size", "seed")
+        },
+        "runs": runs,
+    }
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(report, indent=2) + "\n")
+    print(f"Wrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Compare feature loading: dense pandas parquet round trip (previous path) vs the memory-mapped array bundle.
+
+The parquet side mirrors what consumers used to do: ``pd.read_parquet`` then
+``.drop(columns=['id']).values``, with int64 multi-hot and float64 numeric
+columns as ``create_manga_features`` wrote them. Both sides are also timed up
+to the L2-normalized vectors the models actually use.
+
+Usage: PYTHONPATH=src python benchmarks/bench_feature_load.py --sizes 10000 50000 --tags 500
+"""
+
+import argparse
+import json
+import os
+from pathlib import Path
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from manga_recs.data.feature_matrix import FeatureMatrix, feature_files
+from manga_recs.models.vectors import item_vectors, l2_normalize
+from synthetic import make_features
+
+
+def best_of(fn, repeats: int) -> float:
+    """Fastest of ``repeats`` runs in milliseconds (files are in the page cache after the first)."""
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return round(1000 * min(timings), 2)
+
+
+def parquet_load(path):
+    features = pd.read_parquet(path)
+    return features['id'].to_numpy(), features.drop(columns=['id']).values
+
+
+def parquet_vectors(path):
+    ids, values = parquet_load(path)
+    return ids, l2_normalize(values)
+
+
+def write_legacy_parquet(features: FeatureMatrix, path: Path) -> None:
+    """The dense frame layout used before the bundle: float64 numerics, one int64 column per tag."""
+    frame = pd.DataFrame(features.numeric.astype(np.float64), columns=features.numeric_columns)
+    multi_hot = pd.DataFrame(features.multi_hot.toarray().astype(np.int64), columns=features.multi_hot_columns)
+    frame = pd.concat([frame, multi_hot], axis=1)
+    frame.insert(0, 'id', features.ids)
+    frame.to_parquet(path)
+
+
+def run_size(n_items: int, n_tags: int, repeats: int, directory: Path) -> dict:
+    features = make_features(np.arange(n_items) * 7, n_tags=n_tags)
+    parquet_path = directory / f"features_{n_items}.parquet"
+    bundle_path = directory / f"features_{n_items}.json"
+
+    write_legacy_parquet(features, parquet_path)
+    features.save(bundle_path)
+    bundle_bytes = sum(os.path.getsize(directory / name) for name in feature_files(bundle_path.name))
+
+    return {
+        "items": n_items,
+        "tags": n_tags,
+        "parquet": {
+            "file_mb": round(os.path.getsize(parquet_path) / 2**20, 2),
+            "load_ms": best_of(lambda: parquet_load(parquet_path), repeats),
+            "vectors_ms": best_of(lambda: parquet_vectors(parquet_path), repeats),
+        },
+        "bundle": {
+            "file_mb": round(bundle_bytes / 2**20, 2),
+            "load_ms": best_of(lambda: FeatureMatrix.load(bundle_path), repeats),
+            "load_copy_ms": best_of(lambda: FeatureMatrix.load(bundle_path, mmap=False), repeats),
+            "vectors_ms": best_of(lambda: item_vectors(FeatureMatrix.load(bundle_path)), repeats),
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 50_000])
+    parser.add_argument("--tags", type=int, default=500, help="Multi-hot vocabulary size")
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        results = [run_size(n_items, args.tags, args.repeats, Path(tmp)) for n_items in args.sizes]
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Compare response building: pandas filter/join (previous path) vs precomputed records + orjson.
+
+Usage: PYTHONPATH=src python benchmarks/bench_response_build.py --items 50000 --top-n 10
+"""
+
+import argparse
+import json
+import time
+
+import numpy as np
+import pandas as pd
+
+from manga_recs.serving.responses import build_records, dumps, recommendation_list
+from synthetic import make_metadata, make_neighbor_index
+
+
+def pandas_response(metadata, neighbor_index, manga_id, top_n):
+    """The per-request pandas path the API used before precomputed records."""
+    neighbor_ids, scores = neighbor_index.top_n(manga_id, top_n)
+    top_similarities = pd.Series(scores, index=neighbor_ids, dtype="float64")
+
+    recs = metadata[metadata['id'].isin(top_similarities.index)][['id', 'title', 'description', 'tags']]
+    recs = recs.set_index('id').join(top_similarities.rename("similarity"))
+    recs['similarity'] = recs['similarity'].round(2)
+    recs['similarity'] = recs['similarity'].apply(float)
+    recs['tags'] = recs['tags'].apply(lambda x: list(x) if isinstance(x, (list, pd.Series)) else str(x))
+    recs = recs.sort_values(by="similarity", ascending=False)
+
+    return json.dumps({"title": "query", "recommendations": recs.reset_index().to_dict(orient='records')}).encode()
+
+
+def records_response(records, neighbor_index, manga_id, top_n):
+    rows, scores = neighbor_index.top_n_rows(neighbor_index.row_for(manga_id), top_n)
+    return dumps({"title": "query", "recommendations": recommendation_list(records, rows, scores)})
+
+
+def measure(fn, queries):
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        fn(query)
+        latencies.append(time.perf_counter() - start)
+    latencies = np.array(latencies) * 1e6
+    return {"p50_us": round(float(np.percentile(latencies, 50)), 1), "p99_us": round(float(np.percentile(latencies, 99)), 1)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, default=50_000)
+    parser.add_argument("--top-n", type=int, default=10)
+    parser.add_argument("--requests", type=int, default=2_000)
+    args = parser.parse_args()
+
+    metadata = make_metadata(args.items)
+    neighbor_index = make_neighbor_index(metadata['id'].to_numpy())
+
+    start = time.perf_counter()
+    records = build_records(metadata, neighbor_index.ids)
+    print(f"Built {len(records)} response records in {time.perf_counter() - start:.2f}s")
+
+    queries = np.random.default_rng(1).choice(neighbor_index.ids, size=args.requests).tolist()
+    results = {
+        "pandas": measure(lambda q: pandas_response(metadata, neighbor_index, q, args.top_n), queries),
+        "records": measure(lambda q: records_response(records, neighbor_index, q, args.top_n), queries),
+    }
+    print(json.dumps({"items": args.items, "top_n": args.top_n, **results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
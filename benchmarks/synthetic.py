@@ -0,0 +1,83 @@
+"""Synthetic catalog generators shared by the benchmark scripts."""
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from manga_recs.data.feature_matrix import NUMERIC_COLUMNS, FeatureMatrix
+from manga_recs.models.neighbor_index import NeighborIndex
+
+WORDS = "blade moon star river sky dragon hero love school night ghost king sword city dream".split()
+GENRES = ["Action", "Adventure", "Comedy", "Drama", "Fantasy", "Horror", "Mystery", "Romance", "Sci-Fi", "Sports"]
+
+
+def make_metadata(n_items: int, n_tags: int = 300, seed: int = 0) -> pd.DataFrame:
+    """Return a frame shaped like the cleaned manga metadata parquet."""
+    rng = np.random.default_rng(seed)
+    ids = np.arange(1, n_items + 1) * 7
+    words = rng.choice(WORDS, size=(n_items, 2))
+    tag_names = np.array([f"tag {i}" for i in range(n_tags)])
+
+    return pd.DataFrame({
+        'id': ids,
+        'title': [f"{a} {b} {i}" for i, (a, b) in enumerate(words)],
+        'alt_titles': [[f"romaji {i}"] for i in range(n_items)],
+        'description': [f"A story about the {a} and the {b}. " * 5 for a, b in words],
+        'tags': [list(tag_names[rng.choice(n_tags, size=8, replace=False)]) for _ in range(n_items)],
+        'genres': [list(rng.choice(GENRES, size=2, replace=False)) for _ in range(n_items)],
+        'popularity': rng.integers(10_000, 500_000, size=n_items),
+        'chapters': rng.integers(1, 500, size=n_items).astype(float),
+        'volumes': rng.integers(1, 50, size=n_items).astype(float),
+        'averageScore': rng.integers(60, 95, size=n_items),
+        'meanScore': rng.integers(60, 95, size=n_items),
+        'favourites': rng.integers(0, 10_000, size=n_items),
+        'has_end_date': rng.integers(0, 2, size=n_items),
+        'startDate': pd.to_datetime(
+            {'year': rng.integers(1980, 2025, size=n_items), 'month': rng.integers(1, 13, size=n_items), 'day': 1}
+        ),
+    })
+
+
+def make_neighbor_index(ids, k: int = 50, seed: int = 0) -> NeighborIndex:
+    """Return a neighbor index with random neighbours and descending scores."""
+    rng = np.random.default_rng(seed)
+    n_items = len(ids)
+    k = min(k, n_items - 1)
+    neighbors = rng.integers(0, n_items, size=(n_items, k))
+    scores = -np.sort(-rng.random((n_items, k), dtype=np.float32), axis=1)
+    return NeighborIndex.from_arrays(ids, neighbors, scores, version="synthetic")
+
+
+def make_features(ids, n_tags: int = 300, tags_per_item: int = 10, seed: int = 0) -> FeatureMatrix:
+    """Return features shaped like the real ones: scaled numeric columns plus a multi-hot tag block."""
+    rng = np.random.default_rng(seed)
+    n_items = len(ids)
+    tags_per_item = min(tags_per_item, n_tags)
+    indices = np.sort([rng.choice(n_tags, size=tags_per_item, replace=False) for _ in range(n_items)], axis=1)
+    multi_hot = sparse.csr_matrix(
+        (np.ones(n_items * tags_per_item, dtype=np.float32), indices.ravel(), np.arange(n_items + 1) * tags_per_item),
+        shape=(n_items, n_tags),
+    )
+    return FeatureMatrix(
+        ids=np.asarray(ids, dtype=np.int64),
+        numeric=rng.standard_normal((n_items, len(NUMERIC_COLUMNS)), dtype=np.float32),
+        multi_hot=multi_hot,
+        numeric_columns=list(NUMERIC_COLUMNS),
+        multi_hot_columns=[f"tag {i}" for i in range(n_tags)],
+    )
+
+
+def make_user_features(ids, n_users: int = 1_000, per_user: int = 50, seed: int = 0) -> pd.DataFrame:
+    """Return a frame shaped like the user features parquet."""
+    rng = np.random.default_rng(seed)
+    per_user = min(per_user, len(ids))
+    media = np.concatenate([rng.choice(ids, size=per_user, replace=False) for _ in range(n_users)])
+    status = rng.choice([1.0, 0.8, 0.5, 0.4, 0.1], size=len(media))
+    score = rng.integers(1, 11, size=len(media))
+    return pd.DataFrame({
+        'userId': np.repeat(np.arange(n_users) + 5_000, per_user),
+        'status': status,
+        'score': score,
+        'mediaId': media,
+        'interaction_strength': status * score / 10,
+    })
@@ -1,64 +1,260 @@
-from fastapi import FastAPI, HTTPException
-from manga_recs.api.schemas import RecommendationResponse, RecommendationRequest
-import joblib
-import pandas as pd
-from rapidfuzz import fuzz, process
-from manga_recs.common.constants import (
-    CLEANED_MANGA_METADATA_PARQUET,
-    CLEANED_STATUS,
-    COSINE_SIM_FILENAME,
-    MODELS_STATUS,
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, HTTPException, Query
+from fastapi.responses import JSONResponse, PlainTextResponse, Response
+from manga_recs.api.schemas import (
+    BatchRecommendationRequest,
+    BatchRecommendationResponse,
+    MAX_TOP_N,
+    RecommendationRequest,
+    RecommendationResponse,
+    UserRecommendationResponse,
 )
+import numpy as np
 from manga_recs.common.settings import settings
-from manga_recs.data.load import s3_load
+from manga_recs.serving.artifacts import LoadedModel
+from manga_recs.serving.cache import LRUCache
+from manga_recs.serving.metrics import CONTENT_TYPE, MetricsRegistry, RequestMetricsMiddleware, scraped_metric
+from manga_recs.serving.model_store import ModelStore
+from manga_recs.serving.responses import dumps, recommendation_list
+from manga_recs.serving.title_index import normalize_title
+
+# Neighbor index and metadata are loaded in the background once the app starts
+# (see /ready); newer versions are then hot-swapped in the same thread
+MODEL_STORE = ModelStore(bucket=settings.s3.bucket, poll_interval=settings.api.model_refresh_interval)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    MODEL_STORE.start()
+    yield
+    MODEL_STORE.stop()
+
+
+app = FastAPI(title="Manga Recommendation API", lifespan=lifespan)
+
+# Keys start with the model version (for responses, the content and collaborative
+# index versions) so a new artifact invalidates old entries
+TITLE_CACHE = LRUCache(settings.api.title_cache_size)
+RESPONSE_CACHE = LRUCache(settings.api.response_cache_size)
+
+# In-process metrics, scraped from /metrics in Prometheus text format
+METRICS = MetricsRegistry()
+REQUESTS_TOTAL = METRICS.counter("manga_recs_requests_total", "HTTP requests by route and status.", ("method", "route", "status"))
+REQUEST_SECONDS = METRICS.histogram("manga_recs_request_seconds", "HTTP request latency by route.", ("route",))
+STAGE_SECONDS = METRICS.histogram(
+    "manga_recs_stage_seconds",
+    "Latency of each recommendation stage (title_lookup, scoring, response_build, serialize).",
+    ("endpoint", "stage"),
+)
+app.add_middleware(RequestMetricsMiddleware, requests_total=REQUESTS_TOTAL, request_seconds=REQUEST_SECONDS)
+
+
+@METRICS.collector
+def _state_metrics() -> list[str]:
+    caches = {"title": TITLE_CACHE.stats(), "response": RESPONSE_CACHE.stats()}
+    lines = []
+    for key, name, help, kind in (
+        ("hits", "manga_recs_cache_hits_total", "Cache hits.", "counter"),
+        ("misses", "manga_recs_cache_misses_total", "Cache misses.", "counter"),
+        ("size", "manga_recs_cache_entries", "Cache entries.", "gauge"),
+        ("hit_rate", "manga_recs_cache_hit_ratio", "Cache hits over lookups since start.", "gauge"),
+    ):
+        lines += scraped_metric(name, help, [({"cache": cache}, stats[key]) for cache, stats in caches.items()], kind=kind)
+
+    lines += scraped_metric("manga_recs_model_loaded", "1 once a model is serving requests.", [({}, int(MODEL_STORE.loaded))])
+    if MODEL_STORE.loaded:
+        model = MODEL_STORE.current
+        lines += scraped_metric(
+            "manga_recs_model_info",
+            "Serving model version and engine.",
+            [({"version": model.version, "engine": model.engine, "prefix": model.prefix or ""}, 1)],
+        )
+        lines += scraped_metric("manga_recs_model_items", "Items in the serving model.", [({}, len(model.scorer))])
+        users = len(model.user_profiles) if model.user_profiles is not None else 0
+        lines += scraped_metric("manga_recs_model_users", "Users with read data in the serving model.", [({}, users)])
+    return lines
+
+
+def _current_model() -> LoadedModel:
+    if not MODEL_STORE.loaded:
+        raise HTTPException(status_code=503, detail="Model is still loading.")
+    return MODEL_STORE.current
+
+
+def _resolve_title(model: LoadedModel, title: str) -> int:
+    """Map a requested title to a manga id, caching the result per model version."""
+    cache_key = (model.version, normalize_title(title))
+    manga_id = TITLE_CACHE.get(cache_key)
+    if manga_id is not None:
+        return manga_id
+
+    # Find manga ID from title (exact hit, else fuzzy match over n-gram candidates)
+    match = model.title_index.lookup(title, settings.api.fuzzy_match_threshold)
+    if match is None:
+        raise HTTPException(status_code=404, detail=f"Title '{title}' not found in metadata.")
+
+    TITLE_CACHE.put(cache_key, match.manga_id)
+    return match.manga_id
+
+
+def _collaborative_weight(model: LoadedModel, requested: float | None) -> float:
+    """Effective blend weight; 0 when no collaborative index is loaded."""
+    if model.hybrid is None:
+        return 0.0
+    return requested if requested is not None else settings.recommendation.collaborative_weight
 
-app = FastAPI(title="Manga Recommendation API")
 
-# Load similarity matrix and metadata at startup
-SIM_PATH = s3_load(COSINE_SIM_FILENAME, bucket=settings.s3.bucket, status=MODELS_STATUS)
-SIM_MATRIX = joblib.load(SIM_PATH)
+def _json(payload) -> Response:
+    # Serialize with orjson directly; the payload is already plain lists and dicts
+    return Response(content=dumps(payload), media_type="application/json")
 
-METADATA_PATH = s3_load(CLEANED_MANGA_METADATA_PARQUET, bucket=settings.s3.bucket, status=CLEANED_STATUS)
-METADATA = pd.read_parquet(METADATA_PATH)
 
 @app.post("/recommendations/", response_model=RecommendationResponse)
 def recommend(request: RecommendationRequest):
+    # Pin one model for the whole request, even if a newer one is swapped in meanwhile
+    model = _current_model()
     title = request.title
     top_n = request.top_n
 
-    # Find manga ID from title using fuzzy matchingq
-    titles = METADATA['title'].tolist()
-    best_match = process.extractOne(title, titles, scorer=fuzz.ratio)
-    if best_match is None or best_match[1] < settings.api.fuzzy_match_threshold:
-        raise HTTPException(status_code=404, detail=f"Title '{title}' not found in metadata.")
-    matched_title = best_match[0]
+    with STAGE_SECONDS.time("recommend", "title_lookup"):
+        manga_id = _resolve_title(model, title)
 
-    matched = METADATA[METADATA['title'].str.lower() == matched_title.lower()]
-    if matched.empty:
-        raise HTTPException(status_code=404, detail=f"Title '{title}' not found in metadata.")
-    
-    manga_id = matched['id'].iloc[0]
-    
-    if manga_id not in SIM_MATRIX.index:
-        raise HTTPException(status_code=404, detail=f"Manga ID {manga_id} (from title '{title}') not found in similarity matrix.")
+    mask = None
+    if request.has_filters():
+        if model.vector_engine is None:
+            raise HTTPException(status_code=422, detail="Filters require the 'vector' recommendation engine.")
+        try:
+            mask = model.vector_engine.filter_mask(**request.filters())
+        except ValueError as exc:
+            raise HTTPException(status_code=422, detail=str(exc))
+
+    weight = _collaborative_weight(model, request.collaborative_weight)
+    scorer = model.scorer_for(weight)
+    cache_key = (model.cache_version, manga_id, top_n, tuple(request.filters().values()) if mask is not None else None, weight)
+    recommendations = RESPONSE_CACHE.get(cache_key)
+    if recommendations is None:
+        row = scorer.row_for(manga_id)
+        if row is None:
+            raise HTTPException(status_code=404, detail=f"Manga ID {manga_id} (from title '{title}') not found in {model.engine} index.")
+
+        # Get top-N neighbors for this manga, sorted by similarity
+        with STAGE_SECONDS.time("recommend", "scoring"):
+            if mask is not None:
+                rows, scores = scorer.top_n_rows(row, top_n, mask)
+            else:
+                rows, scores = scorer.top_n_rows(row, top_n)
+        with STAGE_SECONDS.time("recommend", "response_build"):
+            recommendations = recommendation_list(model.records, rows, scores)
+        RESPONSE_CACHE.put(cache_key, recommendations)
+
+    with STAGE_SECONDS.time("recommend", "serialize"):
+        return _json({"title": title, "recommendations": recommendations})
+
+
+@app.post("/recommendations/batch", response_model=BatchRecommendationResponse)
+def recommend_batch(request: BatchRecommendationRequest):
+    if len(request.titles) + len(request.ids) > settings.api.max_batch_size:
+        raise HTTPException(status_code=422, detail=f"Batch size exceeds the limit of {settings.api.max_batch_size}.")
+
+    model = _current_model()
+    version = model.cache_version
+    top_n = request.top_n
+    weight = _collaborative_weight(model, request.collaborative_weight)
+    scorer = model.scorer_for(weight)
+    items = []
+    manga_ids = []
+
+    # Resolve titles one by one (each is a cached dict/n-gram lookup); misses become per-item errors
+    with STAGE_SECONDS.time("batch", "title_lookup"):
+        for title in request.titles:
+            item = {"title": title, "id": None, "recommendations": [], "error": None}
+            try:
+                item["id"] = _resolve_title(model, title)
+            except HTTPException as exc:
+                item["error"] = exc.detail
+            items.append(item)
+            manga_ids.append(item["id"] if item["id"] is not None else -1)
+
+    items.extend({"title": None, "id": manga_id, "recommendations": [], "error": None} for manga_id in request.ids)
+    manga_ids.extend(request.ids)
+
+    rows, found = scorer.rows_for(manga_ids) if manga_ids else (np.empty(0, dtype=np.int64), np.empty(0, dtype=bool))
+
+    # Serve cached payloads, and gather the rest into one batch
+    pending = []
+    for position, item in enumerate(items):
+        if item["error"] is not None:
+            continue
+        if not found[position]:
+            item["error"] = f"Manga ID {item['id']} not found in {model.engine} index."
+            continue
+        cached = RESPONSE_CACHE.get((version, item["id"], top_n, None, weight))
+        if cached is None:
+            pending.append(position)
+        else:
+            item["recommendations"] = cached
+
+    if pending:
+        with STAGE_SECONDS.time("batch", "scoring"):
+            neighbor_rows, scores = scorer.top_n_batch(rows[pending], top_n)
+        with STAGE_SECONDS.time("batch", "response_build"):
+            for position, rows_row, scores_row in zip(pending, neighbor_rows, scores):
+                recommendations = recommendation_list(model.records, rows_row, scores_row)
+                RESPONSE_CACHE.put((version, items[position]["id"], top_n, None, weight), recommendations)
+                items[position]["recommendations"] = recommendations
+
+    with STAGE_SECONDS.time("batch", "serialize"):
+        return _json({"results": items})
+
+
+@app.get("/users/{user_id}/recommendations", response_model=UserRecommendationResponse)
+def recommend_for_user(user_id: int, top_n: int = Query(settings.recommendation.default_top_n, ge=1, le=MAX_TOP_N)):
+    """Personalized top-N from the items on the user's list, excluding those items."""
+    model = _current_model()
+    if model.user_profiles is None:
+        raise HTTPException(status_code=503, detail="User data is not loaded.")
+
+    cache_key = ("user", model.cache_version, user_id, top_n)
+    recommendations = RESPONSE_CACHE.get(cache_key)
+    if recommendations is None:
+        with STAGE_SECONDS.time("users", "scoring"):
+            result = model.user_profiles.top_n_rows(model.scorer, user_id, top_n)
+        if result is None:
+            raise HTTPException(status_code=404, detail=f"User {user_id} not found in read data.")
+        with STAGE_SECONDS.time("users", "response_build"):
+            recommendations = recommendation_list(model.records, *result)
+        RESPONSE_CACHE.put(cache_key, recommendations)
+
+    with STAGE_SECONDS.time("users", "serialize"):
+        return _json({"user_id": user_id, "recommendations": recommendations})
+
+
+@app.get("/cache/stats")
+def cache_stats():
+    """Hit/miss counters for the in-process caches, used to size them."""
+    return {
+        "model_version": MODEL_STORE.current.version if MODEL_STORE.loaded else None,
+        "title": TITLE_CACHE.stats(),
+        "response": RESPONSE_CACHE.stats(),
+    }
 
-    # Get similarity scores for this manga
-    similarities = SIM_MATRIX.loc[manga_id]
 
-    # Get top-N
-    top_similarities = similarities.sort_values(ascending=False).head(top_n)
+@app.get("/metrics")
+def metrics():
+    """Request counts, per-stage latency histograms, cache and model gauges for Prometheus."""
+    return PlainTextResponse(METRICS.render(), media_type=CONTENT_TYPE)
 
-    # Get metadata for recommended manga
-    recs = METADATA[METADATA['id'].isin(top_similarities.index)][['id', 'title', 'description', 'tags']]
 
-    # Merge similarity scores
-    recs = recs.set_index('id').join(top_similarities.rename("similarity"))
-    recs['similarity'] = recs['similarity'].round(2)
+@app.get("/model")
+def model_info():
+    """Version of the model currently serving requests, to confirm rollouts."""
+    return _current_model().info()
 
-    # Conert dtypes for JSON serialization
-    recs['similarity'] = recs['similarity'].apply(float)
-    recs['tags'] = recs['tags'].apply(lambda x: list(x) if isinstance(x, (list, pd.Series)) else str(x))
 
-    recs = recs.sort_values(by="similarity", ascending=False)
-    
-    return RecommendationResponse(title=title, recommendations=recs.reset_index().to_dict(orient='records'))
\ No newline at end of file
+@app.get("/ready")
+def ready():
+    """Readiness probe: 503 until the model artifacts have finished loading."""
+    if not MODEL_STORE.loaded:
+        return JSONResponse(status_code=503, content={"ready": False, "error": MODEL_STORE.load_error})
+    return {"ready": True, "version": MODEL_STORE.current.version}
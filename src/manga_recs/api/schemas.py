@@ -1,11 +1,52 @@
-from pydantic import BaseModel
-from typing import List
+from pydantic import BaseModel, Field
+from typing import List, Optional
+
+# Upper bound on recommendations per item or user in one response
+MAX_TOP_N = 100
 
 class RecommendationRequest(BaseModel):
     title: str
-    top_n: int = 5
+    top_n: int = Field(default=5, ge=1, le=MAX_TOP_N)
+    # Optional filters, served by the "vector" recommendation engine
+    finished_only: bool = False
+    genres: List[str] = []
+    tags: List[str] = []
+    min_release_year: Optional[int] = None
+    max_release_year: Optional[int] = None
+    # Overrides recommendation.collaborative_weight for this request
+    collaborative_weight: Optional[float] = Field(default=None, ge=0.0, le=1.0)
+
+    def filters(self) -> dict:
+        return {
+            "finished_only": self.finished_only,
+            "genres": tuple(self.genres),
+            "tags": tuple(self.tags),
+            "min_release_year": self.min_release_year,
+            "max_release_year": self.max_release_year,
+        }
+
+    def has_filters(self) -> bool:
+        return bool(self.finished_only or self.genres or self.tags or self.min_release_year is not None or self.max_release_year is not None)
 
 class RecommendationResponse(BaseModel):
     title: str
     recommendations: List[dict]
 
+class UserRecommendationResponse(BaseModel):
+    user_id: int
+    recommendations: List[dict]
+
+class BatchRecommendationRequest(BaseModel):
+    titles: List[str] = []
+    ids: List[int] = []
+    top_n: int = Field(default=5, ge=1, le=MAX_TOP_N)
+    collaborative_weight: Optional[float] = Field(default=None, ge=0.0, le=1.0)
+
+class BatchRecommendationItem(BaseModel):
+    title: Optional[str] = None
+    id: Optional[int] = None
+    recommendations: List[dict] = []
+    error: Optional[str] = None
+
+class BatchRecommendationResponse(BaseModel):
+    results: List[BatchRecommendationItem]
@@ -11,11 +11,23 @@ def build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(prog="manga-recs", description="Manga Recs CLI")
     subparsers = parser.add_subparsers(dest="command", required=True)
 
-    subparsers.add_parser("ingest", help="Run data ingestion")
+    ingest_parser = subparsers.add_parser("ingest", help="Run data ingestion")
+    ingest_parser.add_argument("--fresh", action="store_true", help="Discard an interrupted run's shards instead of resuming")
     subparsers.add_parser("clean", help="Run data cleaning")
     subparsers.add_parser("features", help="Run feature engineering")
-    subparsers.add_parser("pipeline", help="Run full data pipeline")
-    subparsers.add_parser("train", help="Train similarity model")
+    pipeline_parser = subparsers.add_parser("pipeline", help="Run full data pipeline")
+    pipeline_parser.add_argument("--mlflow", action="store_true", default=None, help="Log the run manifest to MLflow")
+    pipeline_parser.add_argument("--skip-ingest", action="store_true", help="Start from the raw data already on S3")
+    train_parser = subparsers.add_parser("train", help="Train similarity model")
+    train_parser.add_argument("--workers", type=int, default=None, help="Processes for the neighbor index (0 = one per CPU)")
+    mode = train_parser.add_mutually_exclusive_group()
+    mode.add_argument("--incremental", dest="incremental", action="store_true", default=None, help="Patch the previous neighbor index")
+    mode.add_argument("--full", dest="incremental", action="store_false", help="Rebuild the neighbor index from scratch")
+    train_parser.add_argument("--verify", action="store_true", default=None, help="Check an incremental update against a full rebuild")
+    evaluate_parser = subparsers.add_parser("evaluate", help="Measure recommendation quality on held-out reads")
+    evaluate_parser.add_argument("--k", type=int, default=None, help="Recommendations per user")
+    evaluate_parser.add_argument("--model-version", default=None, help="Dated model prefix to evaluate (default: latest)")
+    evaluate_parser.add_argument("--batch-size", type=int, default=None, help="Users scored per batch")
 
     api_parser = subparsers.add_parser("api", help="Start FastAPI server")
     api_parser.add_argument("--host", default="127.0.0.1", help="Host for API server")
@@ -32,7 +44,7 @@ def main() -> None:
     if args.command == "ingest":
         from manga_recs.data.ingestion import ingest_data
 
-        ingest_data()
+        ingest_data(resume=False if args.fresh else None)
     elif args.command == "clean":
         from manga_recs.data.cleaning import clean_data
 
@@ -44,11 +56,15 @@ def main() -> None:
     elif args.command == "pipeline":
         from manga_recs.pipelines.orchestrator import run_pipeline
 
-        run_pipeline()
+        run_pipeline(log_mlflow=args.mlflow, skip_ingest=args.skip_ingest)
     elif args.command == "train":
         from manga_recs.models.train_similarity import train
 
-        train()
+        train(workers=args.workers, incremental=args.incremental, verify=args.verify)
+    elif args.command == "evaluate":
+        from manga_recs.models.evaluate import evaluate
+
+        evaluate(model_version=args.model_version, k=args.k, batch_size=args.batch_size)
     elif args.command == "api":
         _run_api(host=args.host, port=args.port, reload=not args.no_reload)
     else:
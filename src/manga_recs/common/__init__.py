@@ -1,32 +1,42 @@
 from .constants import (
+    ANN_INDEX_FILENAME,
     CLEANED_MANGA_METADATA_PARQUET,
     CLEANED_USER_READDATA_PARQUET,
+    COLLAB_INDEX_FILENAME,
     COSINE_SIM_FILENAME,
     FEATURES_STATUS,
-    MANGA_FEATURES_PARQUET,
+    ITEM_VECTORS_FILENAME,
+    MANGA_FEATURES_FILENAME,
     MANGA_METADATA_JSON,
     MODELS_STATUS,
+    NEIGHBOR_INDEX_FILENAME,
     RAW_STATUS,
     USER_FEATURES_PARQUET,
     USER_READDATA_JSON,
+    USER_READDATA_SHARDS_DIR,
 )
 from .paths import CLEANED_DIR, FEATURES_DIR, MODELS_DIR, RAW_DIR
 from .settings import settings
 
 __all__ = [
+    "ANN_INDEX_FILENAME",
     "CLEANED_DIR",
     "CLEANED_MANGA_METADATA_PARQUET",
     "CLEANED_USER_READDATA_PARQUET",
+    "COLLAB_INDEX_FILENAME",
     "COSINE_SIM_FILENAME",
     "FEATURES_DIR",
     "FEATURES_STATUS",
-    "MANGA_FEATURES_PARQUET",
+    "ITEM_VECTORS_FILENAME",
+    "MANGA_FEATURES_FILENAME",
     "MANGA_METADATA_JSON",
     "MODELS_DIR",
     "MODELS_STATUS",
+    "NEIGHBOR_INDEX_FILENAME",
     "RAW_DIR",
     "RAW_STATUS",
     "settings",
     "USER_FEATURES_PARQUET",
     "USER_READDATA_JSON",
+    "USER_READDATA_SHARDS_DIR",
 ]
\ No newline at end of file
@@ -5,11 +5,16 @@ MODELS_STATUS = "models"
 
 MANGA_METADATA_JSON = "manga_metadata.json"
 USER_READDATA_JSON = "user_readdata.json"
+USER_READDATA_SHARDS_DIR = "user_readdata_shards"
 
 CLEANED_MANGA_METADATA_PARQUET = "cleaned_manga_metadata.parquet"
 CLEANED_USER_READDATA_PARQUET = "cleaned_user_readdata.parquet"
 
-MANGA_FEATURES_PARQUET = "manga_features.parquet"
+MANGA_FEATURES_FILENAME = "manga_features.json"
 USER_FEATURES_PARQUET = "user_features.parquet"
 
-COSINE_SIM_FILENAME = "cosine_sim.pkl"
\ No newline at end of file
+COSINE_SIM_FILENAME = "cosine_sim.pkl"
+NEIGHBOR_INDEX_FILENAME = "neighbor_index.json"
+ANN_INDEX_FILENAME = "ann_index.json"
+COLLAB_INDEX_FILENAME = "collab_index.json"
+ITEM_VECTORS_FILENAME = "item_vectors.json"
\ No newline at end of file
@@ -27,6 +27,11 @@ class S3Settings:
 class ApiSettings:
     graphql_url: str
     fuzzy_match_threshold: int
+    fuzzy_max_candidates: int
+    title_cache_size: int
+    response_cache_size: int
+    max_batch_size: int
+    model_refresh_interval: float
 
 
 @dataclass(frozen=True)
@@ -37,6 +42,9 @@ class IngestionSettings:
     user_end_id: int
     user_max_pages: int
     user_per_page: int
+    workers: int
+    shard_size: int
+    resume: bool
 
 
 @dataclass(frozen=True)
@@ -47,6 +55,58 @@ class MlflowSettings:
 @dataclass(frozen=True)
 class RecommendationSettings:
     default_top_n: int
+    neighbor_k: int
+    engine: str
+    collaborative_weight: float
+
+
+@dataclass(frozen=True)
+class FeatureSettings:
+    description_features: int
+    description_weight: float
+    chunk_size: int
+    popularity_bucket: float
+    score_bucket: float
+
+
+@dataclass(frozen=True)
+class SimilaritySettings:
+    block_size: int
+    workers: int
+    exact_check_rows: int
+    save_dense: bool
+    incremental: bool
+    verify_incremental: bool
+    max_rescore_fraction: float
+
+
+@dataclass(frozen=True)
+class AnnSettings:
+    enabled: bool
+    n_lists: int
+    n_probe: int
+    kmeans_iters: int
+    recall_sample: int
+
+
+@dataclass(frozen=True)
+class CollaborativeSettings:
+    enabled: bool
+    chunk_size: int
+
+
+@dataclass(frozen=True)
+class EvaluationSettings:
+    k: int
+    holdout_fraction: float
+    min_interactions: int
+    batch_size: int
+    seed: int
+
+
+@dataclass(frozen=True)
+class PipelineSettings:
+    log_mlflow: bool
 
 
 @dataclass(frozen=True)
@@ -57,6 +117,12 @@ class Settings:
     ingestion: IngestionSettings
     mlflow: MlflowSettings
     recommendation: RecommendationSettings
+    features: FeatureSettings
+    similarity: SimilaritySettings
+    ann: AnnSettings
+    collaborative: CollaborativeSettings
+    evaluation: EvaluationSettings
+    pipeline: PipelineSettings
 
 
 def _load_toml(path: Path) -> dict[str, Any]:
@@ -100,6 +166,12 @@ def get_settings() -> Settings:
     ingestion = config.get("ingestion", {})
     mlflow = config.get("mlflow", {})
     recommendation = config.get("recommendation", {})
+    features = config.get("features", {})
+    similarity = config.get("similarity", {})
+    ann = config.get("ann", {})
+    collaborative = config.get("collaborative", {})
+    evaluation = config.get("evaluation", {})
+    pipeline = config.get("pipeline", {})
 
     return Settings(
         paths=PathsSettings(
@@ -112,6 +184,11 @@ def get_settings() -> Settings:
         api=ApiSettings(
             graphql_url=os.getenv("MANGA_RECS_GRAPHQL_URL", api.get("graphql_url", "https://graphql.anilist.co")),
             fuzzy_match_threshold=int(api.get("fuzzy_match_threshold", 70)),
+            fuzzy_max_candidates=int(api.get("fuzzy_max_candidates", 50)),
+            title_cache_size=int(api.get("title_cache_size", 10000)),
+            response_cache_size=int(api.get("response_cache_size", 2048)),
+            max_batch_size=int(api.get("max_batch_size", 100)),
+            model_refresh_interval=float(api.get("model_refresh_interval", 300)),
         ),
         ingestion=IngestionSettings(
             rate_limit=int(ingestion.get("rate_limit", 10)),
@@ -120,12 +197,55 @@ def get_settings() -> Settings:
             user_end_id=int(ingestion.get("user_end_id", 1500)),
             user_max_pages=int(ingestion.get("user_max_pages", 200)),
             user_per_page=int(ingestion.get("user_per_page", 50)),
+            workers=int(ingestion.get("workers", 4)),
+            shard_size=int(ingestion.get("shard_size", 50)),
+            resume=bool(ingestion.get("resume", True)),
         ),
         mlflow=MlflowSettings(
             experiment_name=os.getenv("MANGA_RECS_MLFLOW_EXPERIMENT", mlflow.get("experiment_name", "manga_cosine_recommender")),
         ),
         recommendation=RecommendationSettings(
             default_top_n=int(recommendation.get("default_top_n", 5)),
+            neighbor_k=int(recommendation.get("neighbor_k", 50)),
+            engine=str(recommendation.get("engine", "neighbors")),
+            collaborative_weight=float(recommendation.get("collaborative_weight", 0.0)),
+        ),
+        features=FeatureSettings(
+            description_features=int(features.get("description_features", 4096)),
+            description_weight=float(features.get("description_weight", 1.0)),
+            chunk_size=int(features.get("chunk_size", 1000)),
+            popularity_bucket=float(features.get("popularity_bucket", 0.25)),
+            score_bucket=float(features.get("score_bucket", 5)),
+        ),
+        similarity=SimilaritySettings(
+            block_size=int(similarity.get("block_size", 1024)),
+            workers=int(similarity.get("workers", 1)),
+            exact_check_rows=int(similarity.get("exact_check_rows", 200)),
+            save_dense=bool(similarity.get("save_dense", False)),
+            incremental=bool(similarity.get("incremental", False)),
+            verify_incremental=bool(similarity.get("verify_incremental", False)),
+            max_rescore_fraction=float(similarity.get("max_rescore_fraction", 0.5)),
+        ),
+        ann=AnnSettings(
+            enabled=bool(ann.get("enabled", False)),
+            n_lists=int(ann.get("n_lists", 0)),
+            n_probe=int(ann.get("n_probe", 8)),
+            kmeans_iters=int(ann.get("kmeans_iters", 10)),
+            recall_sample=int(ann.get("recall_sample", 1000)),
+        ),
+        collaborative=CollaborativeSettings(
+            enabled=bool(collaborative.get("enabled", True)),
+            chunk_size=int(collaborative.get("chunk_size", 2048)),
+        ),
+        evaluation=EvaluationSettings(
+            k=int(evaluation.get("k", 10)),
+            holdout_fraction=float(evaluation.get("holdout_fraction", 0.2)),
+            min_interactions=int(evaluation.get("min_interactions", 5)),
+            batch_size=int(evaluation.get("batch_size", 1024)),
+            seed=int(evaluation.get("seed", 0)),
+        ),
+        pipeline=PipelineSettings(
+            log_mlflow=bool(pipeline.get("log_mlflow", False)),
         ),
     )
 
@@ -11,9 +11,11 @@ from manga_recs.common.settings import settings
 from manga_recs.data.load import s3_dump, s3_load
 from manga_recs.data.transform import clean_manga_metadata, clean_user_readdata
 from manga_recs.data.utils import load_json, save_parquet
+from manga_recs.pipelines.manifest import StageMetrics
 
 
-def clean_data():
+def clean_data(stage: StageMetrics | None = None):
+    stage = stage if stage is not None else StageMetrics("clean")
     manga_path = RAW_DIR / MANGA_METADATA_JSON
     user_path = RAW_DIR / USER_READDATA_JSON
     CLEANED_DIR.mkdir(parents=True, exist_ok=True)
@@ -27,13 +29,19 @@ def clean_data():
     manga_data = load_json(manga_path)
     user_data = load_json(user_path)
     print(f"Loaded {len(manga_data)} manga records and {len(user_data)} user records")
+    stage.read(manga_path, rows=len(manga_data))
+    stage.read(user_path, rows=len(user_data))
 
     print("Cleaning manga metadata...")
-    manga_df = clean_manga_metadata(manga_data)
+    with stage.step("clean_manga_metadata", rows_in=len(manga_data)) as step:
+        manga_df = clean_manga_metadata(manga_data)
+        step.rows_out = len(manga_df)
     print(f"Cleaned manga: {len(manga_df)} records")
 
     print("Cleaning user read data...")
-    user_df = clean_user_readdata(user_data)
+    with stage.step("clean_user_readdata", rows_in=len(user_data)) as step:
+        user_df = clean_user_readdata(user_data)
+        step.rows_out = len(user_df)
     print(f"Cleaned user data: {len(user_df)} records")
 
     manga_output_path = CLEANED_DIR / CLEANED_MANGA_METADATA_PARQUET
@@ -41,6 +49,8 @@ def clean_data():
 
     save_parquet(manga_df, manga_output_path)
     save_parquet(user_df, user_output_path)
+    stage.wrote(manga_output_path, rows=len(manga_df))
+    stage.wrote(user_output_path, rows=len(user_df))
 
     print("Uploading to S3...")
     s3_dump(str(manga_output_path), manga_output_path.name, status=CLEANED_STATUS)
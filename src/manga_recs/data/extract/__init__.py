@@ -1,2 +1,3 @@
+from .checkpoint import UserShardCheckpoint, fetch_fingerprint
 from .pull_manga import fetch_manga_data
-from .pull_userdata import fetch_user_data
\ No newline at end of file
+from .pull_userdata import fetch_user_data_to_shards
\ No newline at end of file
@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from pathlib import Path
+import shutil
+from typing import Dict, Iterable, List, Set, Tuple
+
+CHECKPOINT_FILENAME = "checkpoint.jsonl"
+
+
+def fetch_fingerprint(query: str, max_pages: int) -> str:
+    """Identifies what a shard contains; shards fetched with another query or page cap are not reused."""
+    return hashlib.sha256(f"{max_pages}\n{query}".encode("utf-8")).hexdigest()[:16]
+
+
+class UserShardCheckpoint:
+    """
+    On-disk progress of a user-data ingestion run.
+
+    Finished batches of users are written as JSON-lines shards, one record per
+    line. Each shard is written to a temporary name and renamed into place.
+    Only then is a line naming the shard and its user ids (with their record
+    counts) appended to ``checkpoint.jsonl``. A crash therefore loses at most
+    the batch in flight, and a torn last line is ignored on the next load. The
+    first line holds the fetch fingerprint. A directory left by a different
+    query or page cap is cleared rather than resumed.
+
+    Users that failed with server errors get a separate ``failed`` line. They
+    are not done, so a resumed run fetches them again, and a later shard
+    holding them clears the mark.
+    """
+
+    def __init__(self, directory: Path, fingerprint: str):
+        self.directory = Path(directory)
+        self.fingerprint = fingerprint
+        self.path = self.directory / CHECKPOINT_FILENAME
+        self.shards: List[str] = []
+        self.users: Dict[int, int] = {}
+        self.failed: Set[int] = set()
+        self._load()
+
+    def _load(self) -> None:
+        if not self.path.exists():
+            return
+
+        with open(self.path, "r", encoding="utf-8") as f:
+            lines = f.read().splitlines()
+        try:
+            header = json.loads(lines[0]) if lines else {}
+        except ValueError:
+            header = {}
+        if header.get("fingerprint") != self.fingerprint:
+            print(f"Discarding ingestion checkpoint in {self.directory}: fetched with different settings")
+            self.clear()
+            return
+
+        for line in lines[1:]:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                # Torn write from an interrupted run; that shard is fetched again
+                continue
+            if "failed" in entry:
+                self.failed.update(entry["failed"])
+                continue
+            if not (self.directory / entry["shard"]).exists():
+                continue
+            self.shards.append(entry["shard"])
+            self.users.update({int(user_id): records for user_id, records in entry["users"].items()})
+        self.failed -= self.users.keys()
+
+    def completed(self, user_ids: Iterable[int]) -> List[int]:
+        return [user_id for user_id in user_ids if user_id in self.users]
+
+    def _append(self, entry: dict) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        if not self.path.exists():
+            with open(self.path, "w", encoding="utf-8") as f:
+                f.write(json.dumps({"fingerprint": self.fingerprint}) + "\n")
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def record_failed(self, user_ids: List[int]) -> None:
+        """Note users that could not be fetched; they stay pending for the next run."""
+        self._append({"failed": list(user_ids)})
+        self.failed.update(user_ids)
+
+    def write_shard(self, fetched: List[Tuple[int, List[Dict]]]) -> Path:
+        """Persist a batch of (user id, records) and mark those users done."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+        user_ids = [user_id for user_id, _ in fetched]
+        name = f"users_{min(user_ids):09d}_{max(user_ids):09d}.jsonl"
+        shard_path = self.directory / name
+        tmp_path = shard_path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for _, records in fetched:
+                for record in records:
+                    f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, shard_path)
+
+        users = {user_id: len(records) for user_id, records in fetched}
+        self._append({"shard": name, "users": users})
+
+        self.shards.append(name)
+        self.users.update(users)
+        self.failed -= users.keys()
+        return shard_path
+
+    def merge(self, output_path: Path, start_user_id: int, end_user_id: int) -> int:
+        """
+        Stream every shard's records for users in the range into one JSON array.
+
+        Shards are read one line at a time, so memory does not grow with the
+        number of records. Returns the number of records written.
+        """
+        rows = 0
+        with open(output_path, "w", encoding="utf-8") as out:
+            out.write("[")
+            for name in sorted(self.shards):
+                with open(self.directory / name, "r", encoding="utf-8") as f:
+                    for line in f:
+                        if not start_user_id <= json.loads(line)["userId"] <= end_user_id:
+                            continue
+                        out.write(",\n" if rows else "\n")
+                        out.write(line.rstrip("\n"))
+                        rows += 1
+            out.write("\n]\n")
+        return rows
+
+    def clear(self) -> None:
+        shutil.rmtree(self.directory, ignore_errors=True)
+        self.shards = []
+        self.users = {}
+        self.failed = set()
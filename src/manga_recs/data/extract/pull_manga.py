@@ -1,27 +1,27 @@
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict
 
-def fetch_manga_data(client, query, rate_limiter, avg_score: int = 70, popularity: int = 20000, per_page: int = 50) -> List[Dict]:
+def fetch_manga_data(client, query, avg_score: int = 70, popularity: int = 20000, per_page: int = 50, workers: int = 1) -> List[Dict]:
     '''
     Fetches manga metadata from all pages based on arguments
 
+    The first page reports ``lastPage``; pages 2..lastPage are then fetched
+    by ``workers`` threads sharing the client's rate limiter. If the listing
+    grew in the meantime, the remaining pages are walked one by one.
+
     Args:
         client: GraphQL API client
         query (str): GraphQL query string
         avg_score (int): Minimum avg score of manga
         popularity (int): Minimum popularity of manga
         per_page (int): Results per page
+        workers (int): Pages fetched concurrently
 
     Returns:
         List[Dict]: Aggregated mediaList entries across all pages
     '''
 
-    page = 1
-    all_manga = []
-
-    # Go through all pages
-    while True:
-        rate_limiter.wait()
-
+    def fetch_page(page: int) -> Dict:
         # input variables 
         variables = {
             'page': page,
@@ -30,18 +30,27 @@ def fetch_manga_data(client, query, rate_limiter, avg_score: int = 70, popularit
             'averageScoreGreater': avg_score,
             'popularityGreater': popularity
         }
-        result = client.query(query, variables)
-        
-        page_data = result["Page"]
-        all_manga.extend(page_data["media"])
-
-        if not page_data["pageInfo"]["hasNextPage"]:
-            break
+        page_data = client.query(query, variables)["Page"]
         print(f"Fetched page {page}")
+        return page_data
+
+    page_data = fetch_page(1)
+    all_manga = list(page_data["media"])
+    last_page = max(page_data["pageInfo"].get("lastPage") or 1, 1)
+    page = 1
+
+    # Pages are kept in order, so the result matches a sequential walk
+    if page_data["pageInfo"]["hasNextPage"] and last_page > 1:
+        with ThreadPoolExecutor(max_workers=max(workers, 1)) as executor:
+            for page_data in executor.map(fetch_page, range(2, last_page + 1)):
+                all_manga.extend(page_data["media"])
+        page = last_page
+
+    # Go through any pages added after lastPage was read
+    while page_data["pageInfo"]["hasNextPage"]:
         page += 1
+        page_data = fetch_page(page)
+        all_manga.extend(page_data["media"])
         
     print(f"Finished Fetching {page} pages of manga data.")
     return all_manga
-
-
-
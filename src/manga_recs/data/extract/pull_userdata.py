@@ -1,82 +1,119 @@
-from typing import List, Dict
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Optional
 import requests
 
-def fetch_user_data(
+def fetch_user_lists(client, query, user_id: int, per_page: int = 50, max_pages: int = 1000) -> Optional[List[Dict]]:
+    """
+    Fetches every page of one user's manga list.
+
+    Private and missing users are skipped and give an empty list. Users that
+    still hit server errors after the client's retries give None, so callers
+    can try them again later. Any other HTTP error is raised.
+    """
+    media = []
+    page = 1
+
+    while page <= max_pages:
+        variables = {
+            "userId": user_id,
+            "page": page,
+            "perPage": per_page,
+            "type": "MANGA",
+        }
+        try:
+            result = client.query(query, variables)
+        except requests.HTTPError as exc:
+            response_text = ""
+            status_code = None
+            if exc.response is not None and exc.response.text:
+                response_text = exc.response.text.lower()
+                status_code = exc.response.status_code
+
+            if "private user" in response_text or "not found" in response_text:
+                print(f"Skipping user {user_id}: private or unavailable")
+                return []
+
+            if status_code in {500, 502, 503, 504} or "internal server error" in response_text:
+                print(f"Skipping user {user_id}: AniList server error after retries")
+                return None
+
+            raise
+
+        page_data = result["Page"]
+        media.extend(page_data["mediaList"])
+
+        if not page_data["pageInfo"]["hasNextPage"]:
+            break
+
+        page += 1
+
+    print(f"Fetched {len(media)} records for user {user_id}")
+    return media
+
+
+def fetch_user_data_to_shards(
     client,
     query,
-    rate_limiter,
+    checkpoint,
     per_page: int = 50,
     max_pages: int = 1000,
     start_user_id: int = 1,
     end_user_id: int = 1000,
-) -> List[Dict]:
+    workers: int = 1,
+    shard_size: int = 50,
+) -> int:
     """
-    Fetches paginated manga list data from AniList GraphQL API for a user ID range.
+    Fetches a user ID range into on-disk shards, skipping users a previous run finished.
+
+    Pending users are fetched ``shard_size`` at a time by ``workers`` threads.
+    Each finished batch goes to ``checkpoint.write_shard`` before the next
+    starts, so memory is bounded by one shard. A crash or a fatal HTTP error
+    loses only the batch in flight, and rerunning with the same checkpoint
+    resumes from there. Users that failed with server errors are recorded as
+    failed rather than done, so a resumed run fetches them again.
 
     Args:
         client: GraphQL API client
         query (str): GraphQL query string
+        checkpoint (UserShardCheckpoint): Where shards and completed user ids are kept
         per_page (int): Number of items per page
         max_pages (int): Maximum pages to fetch per user
         start_user_id (int): Starting user ID (inclusive)
         end_user_id (int): Ending user ID (inclusive)
+        workers (int): Users fetched concurrently
+        shard_size (int): Users per shard
 
     Returns:
-        List[Dict]: Aggregated mediaList entries across all users and pages
+        int: Records fetched by this run
     """
-    all_media = []
-
-    for user_id in range(start_user_id, end_user_id + 1):
-        page = 1
-        fetched_for_user = 0
-        skipped_user = False
-
-        while page <= max_pages:
-            rate_limiter.wait()
-            variables = {
-                "userId": user_id,
-                "page": page,
-                "perPage": per_page,
-                "type": "MANGA",
-            }
-            try:
-                result = client.query(query, variables)
-            except requests.HTTPError as exc:
-                response_text = ""
-                status_code = None
-                if exc.response is not None and exc.response.text:
-                    response_text = exc.response.text.lower()
-                    status_code = exc.response.status_code
-
-                if "private user" in response_text or "not found" in response_text:
-                    skipped_user = True
-                    print(f"Skipping user {user_id}: private or unavailable")
-                    break
-
-                if status_code in {500, 502, 503, 504} or "internal server error" in response_text:
-                    skipped_user = True
-                    print(f"Skipping user {user_id}: AniList server error after retries")
-                    break
-
-                raise
-
-            page_data = result["Page"]
-            media_list = page_data["mediaList"]
-            all_media.extend(media_list)
-            fetched_for_user += len(media_list)
-
-            if not page_data["pageInfo"]["hasNextPage"]:
-                break
-
-            page += 1
-
-        if not skipped_user:
-            print(f"Fetched {fetched_for_user} records for user {user_id}")
+    user_ids = range(start_user_id, end_user_id + 1)
+    done = set(checkpoint.completed(user_ids))
+    pending = [user_id for user_id in user_ids if user_id not in done]
+    if done:
+        print(f"Resuming: {len(done)} users already fetched, {len(pending)} to go")
 
-    print(
-        f"Finished fetching user data for {end_user_id - start_user_id + 1} users. "
-        f"Total records: {len(all_media)}"
-    )
-    return all_media
+    def fetch_user(user_id: int) -> Optional[List[Dict]]:
+        return fetch_user_lists(client, query, user_id, per_page=per_page, max_pages=max_pages)
 
+    fetched_records = 0
+    shard_size = max(shard_size, 1)
+    with ThreadPoolExecutor(max_workers=max(workers, 1)) as executor:
+        for start in range(0, len(pending), shard_size):
+            batch = pending[start:start + shard_size]
+            results = list(zip(batch, executor.map(fetch_user, batch)))
+            fetched = [(user_id, media_list) for user_id, media_list in results if media_list is not None]
+            failed = [user_id for user_id, media_list in results if media_list is None]
+            if failed:
+                checkpoint.record_failed(failed)
+            if fetched:
+                shard_path = checkpoint.write_shard(fetched)
+                fetched_records += sum(len(media_list) for _, media_list in fetched)
+                print(f"Wrote {shard_path.name} ({len(checkpoint.users)}/{len(user_ids)} users done)")
 
+    print(
+        f"Finished fetching user data for {len(pending)} users. "
+        f"Records fetched this run: {fetched_records}"
+    )
+    if checkpoint.failed:
+        print(f"{len(checkpoint.failed)} users failed with server errors; rerun ingestion to retry them")
+    return fetched_records
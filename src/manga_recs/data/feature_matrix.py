@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+NUMERIC_COLUMNS = ['popularity', 'chapters', 'averageScore', 'has_end_date', 'release_year']
+
+ARRAY_NAMES = ("ids", "numeric", "multi_hot_data", "multi_hot_indices", "multi_hot_indptr")
+
+
+def feature_files(header_filename: str) -> list[str]:
+    # Imported here: the models package imports this module
+    from manga_recs.models.array_bundle import bundle_files
+
+    return bundle_files(header_filename, ARRAY_NAMES)
+
+
+@dataclass(frozen=True)
+class FeatureMatrix:
+    """Manga features as a small dense numeric block plus a sparse multi-hot block.
+
+    ``numeric`` holds the scaled numeric columns (one row per id) and
+    ``multi_hot`` the tag/genre indicators as a CSR matrix, so the width of
+    the tag vocabulary costs nothing for the columns an item does not have.
+    ``scaler`` keeps the StandardScaler parameters the numeric block was
+    scaled with (``columns``, ``mean``, ``scale``) and ``multi_hot_blocks``
+    the source ('tags', 'genres', 'description') of each multi-hot column, so
+    a later run can encode new data into the same layout.
+    """
+
+    ids: np.ndarray
+    numeric: np.ndarray
+    multi_hot: sparse.csr_matrix
+    numeric_columns: list[str]
+    multi_hot_columns: list[str]
+    multi_hot_blocks: list[str] = field(default_factory=list)
+    scaler: dict = field(default_factory=dict)
+    version: str = ""
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def columns(self) -> list[str]:
+        return self.numeric_columns + self.multi_hot_columns
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        return len(self.ids), len(self.numeric_columns) + len(self.multi_hot_columns)
+
+    @property
+    def nnz(self) -> int:
+        return int(np.count_nonzero(self.numeric)) + self.multi_hot.nnz
+
+    def matrix(self) -> sparse.csr_matrix:
+        """Both blocks side by side as one float32 CSR matrix, numeric columns first."""
+        return sparse.hstack(
+            [sparse.csr_matrix(self.numeric, dtype=np.float32), self.multi_hot.astype(np.float32)],
+            format="csr",
+        )
+
+    def sort_by_id(self) -> "FeatureMatrix":
+        order = np.argsort(self.ids, kind="stable")
+        if np.array_equal(order, np.arange(len(order))):
+            return self
+        return FeatureMatrix(
+            ids=self.ids[order],
+            numeric=self.numeric[order],
+            multi_hot=self.multi_hot[order],
+            numeric_columns=self.numeric_columns,
+            multi_hot_columns=self.multi_hot_columns,
+            multi_hot_blocks=self.multi_hot_blocks,
+            scaler=self.scaler,
+            version=self.version,
+        )
+
+    def to_frame(self) -> pd.DataFrame:
+        """Dense frame with an 'id' column, the layout features had before going sparse."""
+        frame = pd.DataFrame(self.matrix().toarray(), columns=self.columns)
+        frame.insert(0, 'id', self.ids)
+        return frame
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, numeric_columns=NUMERIC_COLUMNS) -> "FeatureMatrix":
+        """Split a dense feature frame ('id' plus feature columns) into the two blocks."""
+        numeric_columns = [col for col in numeric_columns if col in df.columns]
+        multi_hot_columns = [col for col in df.columns if col != 'id' and col not in numeric_columns]
+        return cls(
+            ids=df['id'].to_numpy(dtype=np.int64),
+            numeric=df[numeric_columns].to_numpy(dtype=np.float32),
+            multi_hot=sparse.csr_matrix(df[multi_hot_columns].to_numpy(dtype=np.float32)),
+            numeric_columns=numeric_columns,
+            multi_hot_columns=[str(col) for col in multi_hot_columns],
+        )
+
+    def save(self, header_path, version: str | None = None) -> list[Path]:
+        """Write one versioned bundle: a JSON header (schema, scaler) plus raw ``.npy`` arrays.
+
+        The numeric block is stored as one C-contiguous float32 matrix and the
+        multi-hot block as its three CSR arrays, so ``load`` can memory-map
+        every array without parsing or converting anything.
+        """
+        from manga_recs.models.array_bundle import save_bundle
+
+        multi_hot = sparse.csr_matrix(self.multi_hot, dtype=np.float32)
+        multi_hot.sort_indices()
+        arrays = {
+            "ids": np.asarray(self.ids, dtype=np.int64),
+            "numeric": np.ascontiguousarray(self.numeric, dtype=np.float32),
+            "multi_hot_data": multi_hot.data,
+            "multi_hot_indices": multi_hot.indices,
+            "multi_hot_indptr": multi_hot.indptr,
+        }
+        return save_bundle(
+            header_path,
+            arrays,
+            version=version or self.version or None,
+            n_items=len(self.ids),
+            numeric_columns=list(self.numeric_columns),
+            multi_hot_columns=list(self.multi_hot_columns),
+            multi_hot_blocks=list(self.multi_hot_blocks),
+            scaler=self.scaler,
+        )
+
+    @classmethod
+    def load(cls, path, mmap: bool = True) -> "FeatureMatrix":
+        """Open a bundle written by ``save``, memory-mapping the arrays by default.
+
+        Parquet feature files from before the bundle format are still read.
+        """
+        from manga_recs.models.array_bundle import load_bundle
+
+        if Path(path).suffix == ".parquet":
+            return cls._load_parquet(path)
+
+        header, arrays = load_bundle(path, mmap=mmap)
+        return cls(
+            ids=arrays["ids"],
+            numeric=arrays["numeric"],
+            multi_hot=sparse.csr_matrix(
+                (arrays["multi_hot_data"], arrays["multi_hot_indices"], arrays["multi_hot_indptr"]),
+                shape=(header["n_items"], len(header["multi_hot_columns"])),
+                copy=False,
+            ),
+            numeric_columns=header["numeric_columns"],
+            multi_hot_columns=header["multi_hot_columns"],
+            multi_hot_blocks=header.get("multi_hot_blocks") or [],
+            scaler=header.get("scaler") or {},
+            version=header["version"],
+        )
+
+    @classmethod
+    def _load_parquet(cls, path) -> "FeatureMatrix":
+        """Read a dense features parquet ('id' plus one column per feature)."""
+        return cls.from_frame(pd.read_parquet(path))
@@ -3,17 +3,33 @@ from manga_recs.common.constants import (
     CLEANED_STATUS,
     CLEANED_USER_READDATA_PARQUET,
     FEATURES_STATUS,
-    MANGA_FEATURES_PARQUET,
+    MANGA_FEATURES_FILENAME,
     USER_FEATURES_PARQUET,
 )
 from manga_recs.common.paths import CLEANED_DIR, FEATURES_DIR
 from manga_recs.common.settings import settings
+from manga_recs.data.feature_matrix import FeatureMatrix, feature_files
 from manga_recs.data.load import s3_dump, s3_load
 from manga_recs.data.transform import create_manga_features, create_user_features
 from manga_recs.data.utils import load_parquet, save_parquet
+from manga_recs.pipelines.manifest import StageMetrics
 
 
-def build_features():
+def load_previous_features() -> FeatureMatrix | None:
+    """The latest manga feature bundle on S3, read into memory (its local files are about to be overwritten)."""
+    try:
+        paths = [
+            s3_load(name, bucket=settings.s3.bucket, status=FEATURES_STATUS, use_cache=False)
+            for name in feature_files(MANGA_FEATURES_FILENAME)
+        ]
+        return FeatureMatrix.load(paths[0], mmap=False)
+    except Exception as e:
+        print(f"No usable previous features ({e}), fitting the scaler and column order from scratch.")
+        return None
+
+
+def build_features(stage: StageMetrics | None = None):
+    stage = stage if stage is not None else StageMetrics("features")
     manga_clean_path = CLEANED_DIR / CLEANED_MANGA_METADATA_PARQUET
     user_clean_path = CLEANED_DIR / CLEANED_USER_READDATA_PARQUET
     FEATURES_DIR.mkdir(parents=True, exist_ok=True)
@@ -27,19 +43,42 @@ def build_features():
     manga_data = load_parquet(manga_clean_path)
     user_data = load_parquet(user_clean_path)
     print(f"Loaded {len(manga_data)} manga records and {len(user_data)} user records")
+    stage.read(manga_clean_path, rows=len(manga_data))
+    stage.read(user_clean_path, rows=len(user_data))
+
+    # Incremental training can only patch rows whose vectors did not move, so
+    # encode into the previous run's scaler and column layout instead of refitting
+    previous = load_previous_features() if settings.similarity.incremental else None
 
     print("Creating features...")
-    manga_features = create_manga_features(manga_data)
-    user_features = create_user_features(user_data)
+    with stage.step("create_manga_features", rows_in=len(manga_data)) as step:
+        manga_features = create_manga_features(
+            manga_data,
+            description_features=settings.features.description_features,
+            description_weight=settings.features.description_weight,
+            chunk_size=settings.features.chunk_size,
+            popularity_bucket=settings.features.popularity_bucket,
+            score_bucket=settings.features.score_bucket,
+            previous=previous,
+        )
+        step.rows_out = len(manga_features)
+    with stage.step("create_user_features", rows_in=len(user_data)) as step:
+        user_features = create_user_features(user_data)
+        step.rows_out = len(user_features)
 
-    manga_output_path = FEATURES_DIR / MANGA_FEATURES_PARQUET
+    manga_output_path = FEATURES_DIR / MANGA_FEATURES_FILENAME
     user_output_path = FEATURES_DIR / USER_FEATURES_PARQUET
 
-    save_parquet(manga_features, manga_output_path)
+    manga_paths = manga_features.save(manga_output_path)
     save_parquet(user_features, user_output_path)
+    stage.wrote(rows=len(manga_features))
+    for path in manga_paths:
+        stage.wrote(path)
+    stage.wrote(user_output_path, rows=len(user_features))
 
     print("Uploading features to S3...")
-    s3_dump(str(manga_output_path), manga_output_path.name, status=FEATURES_STATUS)
+    for path in manga_paths:
+        s3_dump(str(path), path.name, status=FEATURES_STATUS)
     s3_dump(str(user_output_path), user_output_path.name, status=FEATURES_STATUS)
     print("Upload complete!")
 
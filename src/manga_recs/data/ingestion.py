@@ -5,38 +5,59 @@ from manga_recs.common.constants import (
     MANGA_METADATA_JSON,
     RAW_STATUS,
     USER_READDATA_JSON,
+    USER_READDATA_SHARDS_DIR,
 )
 from manga_recs.common.paths import RAW_DIR
 from manga_recs.common.settings import settings
-from manga_recs.data.extract import fetch_manga_data, fetch_user_data
+from manga_recs.data.extract import UserShardCheckpoint, fetch_fingerprint, fetch_manga_data, fetch_user_data_to_shards
 from manga_recs.data.load import s3_dump
 from manga_recs.data.utils import MangaGraphQLClient, RateLimiter
+from manga_recs.pipelines.manifest import StageMetrics
 
 
-def ingest_data():
-    RAW_DIR.mkdir(parents=True, exist_ok=True)
+def ingest_data(stage: StageMetrics | None = None, resume: bool | None = None):
+    """Fetch manga metadata and user read data, write them to RAW_DIR and upload both.
 
-    client = MangaGraphQLClient(settings.api.graphql_url)
+    User data is fetched into checkpointed shards under RAW_DIR. When
+    ``resume`` (default ``ingestion.resume``) is set, users a previous,
+    interrupted run already finished are not fetched again. The shards are
+    removed once the merged file has been uploaded, unless some users failed
+    with server errors; the next run then only retries those.
+    """
+    stage = stage if stage is not None else StageMetrics("ingest")
+    if resume is None:
+        resume = settings.ingestion.resume
+    RAW_DIR.mkdir(parents=True, exist_ok=True)
 
     manga_query = (files("manga_recs.data.extract.queries") / "manga_metadata.graphql").read_text(encoding="utf-8")
     user_query = (files("manga_recs.data.extract.queries") / "user_readdata.graphql").read_text(encoding="utf-8")
 
+    # One token bucket for every worker thread; it adapts to the server's rate-limit headers
     rate_limiter = RateLimiter(settings.ingestion.rate_limit)
+    client = MangaGraphQLClient(settings.api.graphql_url, rate_limiter=rate_limiter)
 
     manga_data = fetch_manga_data(
         client,
         manga_query,
-        rate_limiter,
         popularity=settings.ingestion.popularity_min,
+        workers=settings.ingestion.workers,
+    )
+    checkpoint = UserShardCheckpoint(
+        RAW_DIR / USER_READDATA_SHARDS_DIR,
+        fetch_fingerprint(user_query, settings.ingestion.user_max_pages),
     )
-    user_data = fetch_user_data(
+    if not resume:
+        checkpoint.clear()
+    fetch_user_data_to_shards(
         client,
         user_query,
-        rate_limiter,
+        checkpoint,
         per_page=settings.ingestion.user_per_page,
         max_pages=settings.ingestion.user_max_pages,
         start_user_id=settings.ingestion.user_start_id,
         end_user_id=settings.ingestion.user_end_id,
+        workers=settings.ingestion.workers,
+        shard_size=settings.ingestion.shard_size,
     )
 
     manga_path = RAW_DIR / MANGA_METADATA_JSON
@@ -45,10 +66,23 @@ def ingest_data():
     with open(manga_path, "w", encoding="utf-8") as f:
         json.dump(manga_data, f, ensure_ascii=False, indent=4)
 
-    with open(user_path, "w", encoding="utf-8") as f:
-        json.dump(user_data, f, ensure_ascii=False, indent=4)
+    user_rows = checkpoint.merge(user_path, settings.ingestion.user_start_id, settings.ingestion.user_end_id)
+
+    stage.wrote(manga_path, rows=len(manga_data))
+    stage.wrote(user_path, rows=user_rows)
 
     s3_dump(str(manga_path), manga_path.name, status=RAW_STATUS)
     s3_dump(str(user_path), user_path.name, status=RAW_STATUS)
 
+    failed = [
+        user_id for user_id in checkpoint.failed
+        if settings.ingestion.user_start_id <= user_id <= settings.ingestion.user_end_id
+    ]
+    if failed:
+        # Keep the shards so the next run only retries the failed users
+        print(f"Keeping {checkpoint.directory} to retry {len(failed)} failed users next run")
+    else:
+        # The run finished, so the next one fetches fresh data instead of resuming
+        checkpoint.clear()
+
     return {"manga": manga_path, "user": user_path}
\ No newline at end of file
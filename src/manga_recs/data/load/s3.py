@@ -69,9 +69,11 @@ def get_latest_s3_file(bucket: str | None = None, status: str = 'raw'):
     
     return latest
 
-def s3_load(filename: str, bucket: str | None = None, status: str = 'raw', use_cache: bool = True):
+def s3_load(filename: str, bucket: str | None = None, status: str = 'raw', use_cache: bool = True, version: str | None = None):
     """
     Download file from S3 if not already cached locally.
+    Pass a dated version to pin that prefix (cached under its own folder)
+    instead of the latest one.
     Returns local path to file.
     """
 
@@ -80,6 +82,8 @@ def s3_load(filename: str, bucket: str | None = None, status: str = 'raw', use_c
 
     # Local folder
     download_dir = Path(settings.paths.data_dir) / status
+    if version is not None:
+        download_dir = download_dir / version
     download_dir.mkdir(parents=True, exist_ok=True)
     local_path = download_dir / filename
 
@@ -96,7 +100,7 @@ def s3_load(filename: str, bucket: str | None = None, status: str = 'raw', use_c
         region_name=os.getenv("AWS_DEFAULT_REGION")
     )
 
-    latest_version = get_latest_s3_file(bucket, status)
+    latest_version = version or get_latest_s3_file(bucket, status)
 
     try:
         s3.download_file(bucket, f'{status}/{latest_version}/{filename}', str(local_path))
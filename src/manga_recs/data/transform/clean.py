@@ -16,6 +16,18 @@ def extract_english_title(title):
             return title.lower()
     return None
 
+def extract_alt_titles(title):
+    """Collect the lowercased romaji/native/english titles not used as the main title."""
+    if not isinstance(title, dict):
+        return []
+    primary = extract_english_title(title)
+    alt_titles = []
+    for key in ('english', 'romaji', 'native'):
+        value = title.get(key)
+        if value and value.lower() != primary and value.lower() not in alt_titles:
+            alt_titles.append(value.lower())
+    return alt_titles
+
 def extract_tag_names(tags):
     if isinstance(tags, list) and tags:
         names = [t.get('name') for t in tags if isinstance(t, dict) and t.get('name')]
@@ -74,7 +86,8 @@ def clean_description(text: Any) -> Any:
 def clean_manga_metadata(data: List[Dict]) -> pd.DataFrame:
     """Clean manga metadata."""
     df = pd.DataFrame(data)
-    # Extract English title, tag names, and end date presence, and convert dates to datetime
+    # Extract English title (keeping the others for title lookup), tag names, and end date presence, and convert dates to datetime
+    df['alt_titles'] = df['title'].apply(extract_alt_titles)
     df['title'] = df['title'].apply(extract_english_title)
     df['tags'] = df['tags'].apply(extract_tag_names)
     df['has_end_date'] = df['endDate'].apply(has_end_date)
@@ -2,8 +2,16 @@ from sklearn.preprocessing import StandardScaler
 from sklearn.preprocessing import MultiLabelBinarizer
 import numpy as np
 import pandas as pd 
-import joblib
 from pathlib import Path
+from scipy import sparse
+
+from manga_recs.data.feature_matrix import FeatureMatrix
+from manga_recs.data.transform.text_features import description_columns, hash_descriptions
+
+MULTI_HOT_COLUMNS = ['tags', 'genres']
+SCALED_COLUMNS = ['popularity', 'chapters', 'averageScore', 'release_year']
+# Inputs AniList revises daily; bucketing them keeps an untouched manga's row identical between runs
+BUCKETED_COLUMNS = ['popularity', 'averageScore']
 
 
 def parse_release_year(start_date):
@@ -12,17 +20,90 @@ def parse_release_year(start_date):
         return start_date.year
     return np.nan
 
-def one_hot_encode_column(df, col):
-    mlb = MultiLabelBinarizer()
+def multi_hot_encode_column(df, col):
+    """Sparse (CSR) 0/1 indicators for a column of label lists, plus the label names."""
+    mlb = MultiLabelBinarizer(sparse_output=True)
     encoded = mlb.fit_transform(df[col])
-    encoded_df = pd.DataFrame(encoded, columns=mlb.classes_, index=df.index)
-    return df.join(encoded_df)
-
-
-def create_manga_features(data, save_dir = 'artifacts/features'):
-
-    save_dir = Path(save_dir)
-    save_dir.mkdir(parents=True, exist_ok=True)
+    return encoded.tocsr().astype(np.float32), [str(label) for label in mlb.classes_]
+
+
+def align_columns(multi_hot, columns, previous_columns):
+    """Move multi-hot columns to their position in a previous layout; columns it lacks go after it.
+
+    ``columns`` and ``previous_columns`` are (block, name) pairs. Columns of
+    the previous layout missing from this data stay in place as all-zero
+    columns, so every previous column keeps its index.
+    """
+    position = {column: i for i, column in enumerate(previous_columns)}
+    layout = list(previous_columns)
+    for column in columns:
+        if column not in position:
+            position[column] = len(layout)
+            layout.append(column)
+
+    target = np.array([position[column] for column in columns], dtype=np.int64)
+    coo = multi_hot.tocoo()
+    aligned = sparse.csr_matrix(
+        (coo.data, (coo.row, target[coo.col])),
+        shape=(multi_hot.shape[0], len(layout)),
+        dtype=np.float32,
+    )
+    return aligned, layout
+
+
+def bucket_values(values, width: float, held=None):
+    """Round values to the nearest multiple of ``width`` (0 leaves them as they are).
+
+    Where ``held`` (the previous run's bucket, NaN for new items) is within one
+    step of the value it is kept, so a value hovering on a bucket edge does
+    not flip between runs.
+    """
+    if width <= 0:
+        return values
+    bucketed = np.round(values / width) * width
+    if held is None:
+        return bucketed
+    return np.where(np.abs(values - held) < width, held, bucketed)
+
+
+def previous_buckets(previous: FeatureMatrix, ids, col: str, width: float) -> np.ndarray:
+    """Unscaled bucket values of ``col`` in the previous features, aligned to ``ids`` (NaN where missing)."""
+    scaled = previous.scaler["columns"].index(col)
+    values = (
+        np.asarray(previous.numeric[:, previous.numeric_columns.index(col)], dtype=np.float64)
+        * previous.scaler["scale"][scaled]
+        + previous.scaler["mean"][scaled]
+    )
+    # Undo the float32 round-off so held values sit exactly on the grid
+    values = np.round(values / width) * width
+    return pd.Series(values, index=np.asarray(previous.ids)).reindex(ids).to_numpy()
+
+
+def create_manga_features(
+    data,
+    description_features: int = 0,
+    description_weight: float = 1.0,
+    chunk_size: int = 1000,
+    popularity_bucket: float = 0.0,
+    score_bucket: float = 0.0,
+    previous: FeatureMatrix | None = None,
+):
+    """Build the sparse manga feature matrix from cleaned metadata.
+
+    With ``description_features`` > 0 the cleaned descriptions are hashed into
+    a block of that many columns, scaled by ``description_weight`` and joined
+    onto the tag/genre block.
+
+    ``popularity_bucket`` (in log-popularity) and ``score_bucket`` (in
+    averageScore points) round those inputs to coarse steps before scaling,
+    so the small daily drift in AniList's counts does not move the vector.
+    With ``previous`` features a manga keeps its previous bucket until the
+    value has moved a full step away from it.
+
+    With ``previous`` features, numeric columns are scaled with its scaler
+    instead of a refit, and multi-hot columns keep its order with new labels
+    appended, so a manga whose metadata did not change gets the same row.
+    """
 
     # Accept either a path-like object or a DataFrame
     if isinstance(data, (str, Path)):
@@ -33,8 +114,12 @@ def create_manga_features(data, save_dir = 'artifacts/features'):
         # Fallback: try to read with pandas (will raise a helpful error if unsupported)
         df = pd.read_parquet(data)
 
+    # Set the text aside so a missing description does not drop the row below
+    descriptions = df['description']
+
     # Drop these for now
     df = df.drop(columns=['title', 'volumes', 'description', 'favourites', 'meanScore'])
+    df = df.drop(columns=['alt_titles'], errors='ignore')  # only used for title lookup, absent in older cleaned data
     
     # Extract release year
     df['release_year'] = df['startDate'].apply(parse_release_year)
@@ -42,28 +127,65 @@ def create_manga_features(data, save_dir = 'artifacts/features'):
 
     df = df.dropna()
 
-    # One hot encode tags
-    df_encoded = one_hot_encode_column(df, 'tags')
-    df_encoded = df_encoded.drop(columns=['tags'])
+    # Multi-hot encode tags and genres straight into one sparse block
+    encoded = [multi_hot_encode_column(df, col) for col in MULTI_HOT_COLUMNS]
+    multi_hot = sparse.hstack([block for block, _ in encoded], format="csr", dtype=np.float32)
+    columns = [(col, name) for col, (_, names) in zip(MULTI_HOT_COLUMNS, encoded) for name in names]
+
+    if description_features > 0:
+        text = hash_descriptions(descriptions.loc[df.index], description_features, chunk_size=chunk_size)
+        multi_hot = sparse.hstack([multi_hot, description_weight * text], format="csr", dtype=np.float32)
+        columns += [('description', name) for name in description_columns(description_features)]
+    df = df.drop(columns=MULTI_HOT_COLUMNS)
 
-    # One hot encode genres
-    df_encoded = one_hot_encode_column(df_encoded, 'genres')
-    df_encoded = df_encoded.drop(columns=['genres'])
+    if previous is not None and previous.multi_hot_blocks:
+        multi_hot, columns = align_columns(
+            multi_hot, columns, list(zip(previous.multi_hot_blocks, previous.multi_hot_columns))
+        )
 
     # Log transform
-    df_encoded['popularity'] = np.log1p(df_encoded['popularity'])
-    df_encoded['chapters'] = np.log1p(df_encoded['chapters'].replace(-1, 0))  # Replace -1 with 0 before log
+    df['popularity'] = np.log1p(df['popularity'])
+    df['chapters'] = np.log1p(df['chapters'].replace(-1, 0))  # Replace -1 with 0 before log
+
+    # The previous scaler and buckets only fit values bucketed the same way
+    buckets = {'popularity': popularity_bucket, 'averageScore': score_bucket}
+    reuse = (
+        previous is not None
+        and previous.scaler.get("columns") == SCALED_COLUMNS
+        and previous.scaler.get("buckets", {}) == buckets
+    )
+    for col in BUCKETED_COLUMNS:
+        held = previous_buckets(previous, df['id'], col, buckets[col]) if reuse and buckets[col] > 0 else None
+        df[col] = bucket_values(df[col], buckets[col], held)
 
     # Standardize numerical features
-    scaler = StandardScaler()
-    num_cols = ['popularity', 'chapters', 'averageScore', 'release_year']
-    df_encoded[num_cols] = scaler.fit_transform(df_encoded[num_cols])
-
-    # Save artifacts
-    joblib.dump(scaler, save_dir / "scaler.pkl")
-    joblib.dump(df_encoded.columns.tolist(), save_dir / "feature_columns.pkl")
-
-    return df_encoded
+    if reuse:
+        scaler_params = previous.scaler
+        df[SCALED_COLUMNS] = (df[SCALED_COLUMNS] - np.asarray(scaler_params["mean"])) / np.asarray(scaler_params["scale"])
+    else:
+        scaler = StandardScaler()
+        df[SCALED_COLUMNS] = scaler.fit_transform(df[SCALED_COLUMNS])
+        scaler_params = {
+            "columns": SCALED_COLUMNS,
+            "mean": scaler.mean_.tolist(),
+            "scale": scaler.scale_.tolist(),
+            "buckets": buckets,
+        }
+
+    # What is left besides the id is the small dense block
+    numeric_columns = [col for col in df.columns if col != 'id']
+    features = FeatureMatrix(
+        ids=df['id'].to_numpy(dtype=np.int64),
+        numeric=df[numeric_columns].to_numpy(dtype=np.float32),
+        multi_hot=multi_hot,
+        numeric_columns=numeric_columns,
+        multi_hot_columns=[name for _, name in columns],
+        multi_hot_blocks=[block for block, _ in columns],
+        # Kept with the features so new items can be scaled the same way
+        scaler=scaler_params,
+    )
+
+    return features
 
 def create_user_features(data):
     # Accept either a path-like object or a DataFrame
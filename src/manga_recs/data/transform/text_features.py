@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+from itertools import islice
+from typing import Iterable
+
+import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction.text import HashingVectorizer
+
+
+def description_vectorizer(n_features: int) -> HashingVectorizer:
+    """Stateless bag-of-words hasher: no vocabulary to fit, store or download.
+
+    Rows are L2-normalized term counts, so a description's weight in the
+    similarity does not depend on its length.
+    """
+    return HashingVectorizer(
+        n_features=n_features,
+        stop_words="english",
+        alternate_sign=False,
+        norm="l2",
+        dtype=np.float32,
+    )
+
+
+def hash_descriptions(descriptions: Iterable, n_features: int, chunk_size: int = 1000) -> sparse.csr_matrix:
+    """Hash cleaned descriptions into a fixed-width (N x n_features) sparse block, one chunk at a time.
+
+    ``descriptions`` can be any iterable (a Series, or a generator reading
+    batches from disk); it is consumed in a single pass and only one chunk of
+    text is held at a time. Missing descriptions give all-zero rows. Each row
+    depends only on its own text, so new or edited items can be hashed alone
+    and stacked onto an existing block.
+    """
+    vectorizer = description_vectorizer(n_features)
+    iterator = iter(descriptions)
+    blocks = []
+    while chunk := list(islice(iterator, chunk_size)):
+        blocks.append(vectorizer.transform([text if isinstance(text, str) else "" for text in chunk]))
+
+    if not blocks:
+        return sparse.csr_matrix((0, n_features), dtype=np.float32)
+    return sparse.vstack(blocks, format="csr")
+
+
+def description_columns(n_features: int) -> list[str]:
+    return [f"description_hash_{i}" for i in range(n_features)]
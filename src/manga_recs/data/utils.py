@@ -1,16 +1,36 @@
-import requests, time, json
+import requests, time, json, threading
 import pandas as pd
-from typing import Dict, Any
+from typing import Dict, Any, Mapping
 
 class MangaGraphQLClient:
     '''
     GraphQL API Client
+
+    Safe to share between threads: each thread gets its own HTTP session, and
+    every attempt (retries included) takes a token from ``rate_limiter`` and
+    reports the response's rate-limit headers back to it.
     '''
     
-    def __init__(self, url: str, timeout: int = 10):
+    def __init__(self, url: str, timeout: int = 10, rate_limiter: "RateLimiter | None" = None):
         self.url = url.rstrip("/")
-        self.session = requests.Session()
         self.timeout = timeout
+        self.rate_limiter = rate_limiter
+        self._local = threading.local()
+
+    @property
+    def session(self) -> requests.Session:
+        # requests.Session is not documented as thread-safe, so keep one per thread
+        if not hasattr(self._local, "session"):
+            self._local.session = requests.Session()
+        return self._local.session
+
+    def _throttled(self, response: requests.Response, attempt: int) -> None:
+        delay = self._retry_delay(response, attempt)
+        if self.rate_limiter is not None:
+            # Pause every worker sharing the limiter, not just this one
+            self.rate_limiter.pause(delay)
+        else:
+            time.sleep(delay)
 
     def _retry_delay(self, response: requests.Response, attempt: int) -> float:
         retry_after = response.headers.get("Retry-After")
@@ -52,12 +72,19 @@ class MangaGraphQLClient:
         last_exception = None
 
         for attempt in range(1, max_retries + 1):
+            if self.rate_limiter is not None:
+                self.rate_limiter.wait()
             response = self.session.post(
                 self.url,
                 json=payload,
                 timeout=self.timeout
             )
+            if self.rate_limiter is not None:
+                self.rate_limiter.observe(response.headers)
 
+            if response.status_code == 429 and attempt < max_retries:
+                self._throttled(response, attempt)
+                continue
             if response.status_code in retryable_statuses and attempt < max_retries:
                 time.sleep(self._retry_delay(response, attempt))
                 continue
@@ -84,7 +111,7 @@ class MangaGraphQLClient:
                 error_blob = json.dumps(result["errors"]).lower()
                 if attempt < max_retries:
                     if "too many requests" in error_blob or '"status": 429' in error_blob:
-                        time.sleep(self._retry_delay(response, attempt))
+                        self._throttled(response, attempt)
                     else:
                         time.sleep(min(2 ** attempt, 8))
                     continue
@@ -96,16 +123,86 @@ class MangaGraphQLClient:
             raise last_exception
         raise RuntimeError("GraphQL query failed without a response.")
     
+def _header_float(headers: Mapping[str, str], name: str) -> float | None:
+    value = headers.get(name)
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
 class RateLimiter:
-    def __init__(self, requests_per_minute: int):
-        self.delay = 60 / requests_per_minute
-        self.last_call = 0.0
+    '''
+    Thread-safe token bucket shared by every ingestion worker.
+
+    Starts at ``requests_per_minute`` and then follows the server: the rate is
+    set from ``X-RateLimit-Limit`` (or spread over what is ``Remaining`` until
+    ``X-RateLimit-Reset`` when both are sent), the bucket never holds more than
+    the server says is remaining, and a 429 pauses everyone until the reset.
+    ``burst`` is how many requests may go out back to back after an idle spell.
+    '''
+
+    def __init__(self, requests_per_minute: float, burst: int = 1):
+        self.rate = requests_per_minute / 60
+        self.capacity = float(max(burst, 1))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        # Waiters sleep on the condition so a rate change wakes them early
+        self._changed = threading.Condition(threading.Lock())
+
+    @property
+    def delay(self) -> float:
+        return 1 / self.rate
+
+    def _refill(self, now: float) -> None:
+        # Nothing accrues while paused
+        start = max(self.updated, self.paused_until)
+        if now > start:
+            self.tokens = min(self.capacity, self.tokens + (now - start) * self.rate)
+        self.updated = max(self.updated, now)
 
     def wait(self):
-        elapsed = time.time() - self.last_call
-        if elapsed < self.delay:
-            time.sleep(self.delay - elapsed)
-        self.last_call = time.time()
+        with self._changed:
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                if now >= self.paused_until and self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                self._changed.wait(max(self.paused_until - now, (1 - self.tokens) / self.rate))
+
+    def pause(self, seconds: float) -> None:
+        '''Hold every waiting worker for ``seconds`` (e.g. a 429's Retry-After).'''
+        with self._changed:
+            now = time.monotonic()
+            self._refill(now)
+            self.tokens = min(self.tokens, 0.0)
+            self.paused_until = max(self.paused_until, now + max(seconds, 0.0))
+            self._changed.notify_all()
+
+    def observe(self, headers: Mapping[str, str]) -> None:
+        '''Adapt the rate to a response's X-RateLimit-* headers; missing headers change nothing.'''
+        limit = _header_float(headers, "X-RateLimit-Limit")
+        remaining = _header_float(headers, "X-RateLimit-Remaining")
+        reset = _header_float(headers, "X-RateLimit-Reset")
+        window = reset - time.time() if reset is not None else None
+
+        with self._changed:
+            now = time.monotonic()
+            self._refill(now)
+            if remaining == 0 and window is not None and window > 0:
+                self.paused_until = max(self.paused_until, now + window)
+            if remaining is not None and remaining > 0 and window is not None and window > 0:
+                self.rate = remaining / window
+            elif limit is not None and limit > 0:
+                self.rate = limit / 60
+            if remaining is not None:
+                # Requests still in flight and other clients share the quota
+                self.tokens = min(self.tokens, remaining)
+            self._changed.notify_all()
 
 def load_json(filepath: str) -> Any:
     """Load JSON file safely (UTF-8, Windows compatible)."""
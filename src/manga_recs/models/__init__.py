@@ -0,0 +1,2 @@
+from .ann import IVFIndex, ann_index_files
+from .neighbor_index import NeighborIndex, build_neighbor_index, build_neighbor_index_blocked, neighbor_index_files
@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from pathlib import Path
+import time
+
+import numpy as np
+from scipy import sparse
+
+from manga_recs.models.array_bundle import bundle_files, load_bundle, save_bundle
+from manga_recs.models.vectors import dense_rows, dot_scores, l2_normalize, top_k_per_row
+
+ARRAY_NAMES = ("ids", "centroids", "list_offsets", "list_rows")
+
+
+def ann_index_files(header_filename: str) -> list[str]:
+    return bundle_files(header_filename, ARRAY_NAMES)
+
+
+def _assign(vectors, centroids: np.ndarray, block_size: int = 8192) -> np.ndarray:
+    """Nearest (highest cosine) centroid for every row, computed in row blocks."""
+    n_items = vectors.shape[0]
+    assignments = np.empty(n_items, dtype=np.int32)
+    for start in range(0, n_items, block_size):
+        block = vectors[start:start + block_size]
+        assignments[start:start + block_size] = np.argmax(dot_scores(block, centroids), axis=1)
+    return assignments
+
+
+def spherical_kmeans(vectors, n_clusters: int, n_iter: int = 10, seed: int = 0) -> np.ndarray:
+    """Cluster unit vectors (dense or CSR) by cosine similarity; returns dense unit-length centroids."""
+    rng = np.random.default_rng(seed)
+    n_items = vectors.shape[0]
+    centroids = dense_rows(vectors, rng.choice(n_items, size=n_clusters, replace=False)).copy()
+
+    for _ in range(n_iter):
+        assignments = _assign(vectors, centroids)
+        counts = np.bincount(assignments, minlength=n_clusters)
+
+        # Sum members per cluster with one sparse membership product instead of a Python loop
+        membership = sparse.csr_matrix(
+            (np.ones(n_items, dtype=np.float32), (assignments, np.arange(n_items))),
+            shape=(n_clusters, n_items),
+        )
+        sums = membership @ vectors
+        sums = sums.toarray() if sparse.issparse(sums) else np.asarray(sums)
+
+        # Re-seed empty clusters from random rows so every list stays usable
+        empty = np.flatnonzero(counts == 0)
+        if len(empty):
+            sums[empty] = dense_rows(vectors, rng.choice(n_items, size=len(empty), replace=False))
+
+        centroids = l2_normalize(sums)
+
+    return centroids
+
+
+@dataclass(frozen=True)
+class IVFIndex:
+    """Inverted-file approximate nearest-neighbour index over unit vectors.
+
+    Items are bucketed by their nearest k-means centroid. A search scores the
+    query against the centroids, then exactly scores only the items in the
+    ``n_probe`` closest lists. More probes mean better recall and more latency.
+    Item rows refer to the id-sorted vector matrix the index was built from.
+    """
+
+    ids: np.ndarray
+    centroids: np.ndarray
+    list_offsets: np.ndarray
+    list_rows: np.ndarray
+    version: str = ""
+
+    @classmethod
+    def build(cls, ids, vectors, n_lists: int = 0, n_iter: int = 10, seed: int = 0) -> "IVFIndex":
+        """Build from id-sorted unit vectors. ``n_lists`` of 0 picks about sqrt(N) lists."""
+        n_items = vectors.shape[0]
+        if n_lists <= 0:
+            n_lists = int(np.sqrt(n_items))
+        n_lists = max(1, min(n_lists, n_items))
+
+        centroids = spherical_kmeans(vectors, n_lists, n_iter=n_iter, seed=seed)
+        assignments = _assign(vectors, centroids)
+
+        # CSR-style layout: rows of list c are list_rows[list_offsets[c]:list_offsets[c + 1]]
+        list_rows = np.argsort(assignments, kind="stable").astype(np.int32)
+        list_offsets = np.zeros(n_lists + 1, dtype=np.int64)
+        np.cumsum(np.bincount(assignments, minlength=n_lists), out=list_offsets[1:])
+
+        return cls(ids=np.asarray(ids, dtype=np.int64), centroids=centroids, list_offsets=list_offsets, list_rows=list_rows)
+
+    @property
+    def n_lists(self) -> int:
+        return len(self.centroids)
+
+    def candidates(self, query: np.ndarray, n_probe: int) -> np.ndarray:
+        """Rows stored in the ``n_probe`` lists whose centroids are closest to ``query``."""
+        n_probe = max(1, min(n_probe, self.n_lists))
+        centroid_scores = self.centroids @ query
+        probes = np.argpartition(-centroid_scores, n_probe - 1)[:n_probe]
+        return np.concatenate([self.list_rows[self.list_offsets[c]:self.list_offsets[c + 1]] for c in probes])
+
+    def search(
+        self,
+        vectors,
+        row: int,
+        top_n: int,
+        n_probe: int,
+        mask: np.ndarray | None = None,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Approximate (neighbor rows, scores) for ``vectors[row]``, excluding itself."""
+        query = dense_rows(vectors, row)
+        candidates = self.candidates(query, n_probe)
+        candidates = candidates[candidates != row]
+        if mask is not None:
+            candidates = candidates[mask[candidates]]
+
+        scores = vectors[candidates] @ query
+        top, top_scores = top_k_per_row(scores[np.newaxis, :], top_n)
+        return candidates[top[0]], top_scores[0]
+
+    def save(self, header_path) -> list[Path]:
+        arrays = {name: getattr(self, name) for name in ARRAY_NAMES}
+        return save_bundle(header_path, arrays, version=self.version, n_items=len(self.ids), n_lists=self.n_lists)
+
+    @classmethod
+    def load(cls, header_path, mmap: bool = True) -> "IVFIndex":
+        header, arrays = load_bundle(header_path, mmap=mmap)
+        return cls(version=header["version"], **arrays)
+
+
+def evaluate_recall(index: IVFIndex, vectors, k: int, n_probe: int, sample_size: int = 1000, seed: int = 0) -> dict:
+    """Compare IVF search with exact search on a random sample of query rows.
+
+    Returns recall@k (share of the exact top-k that IVF also returns) and
+    mean per-query latency of both searches, in milliseconds.
+    """
+    rng = np.random.default_rng(seed)
+    n_items = vectors.shape[0]
+    sample = rng.choice(n_items, size=min(sample_size, n_items), replace=False)
+
+    hits = 0
+    exact_seconds = ann_seconds = 0.0
+    for row in sample.tolist():
+        started = time.perf_counter()
+        scores = vectors @ dense_rows(vectors, row)
+        scores[row] = -np.inf
+        exact, _ = top_k_per_row(scores[np.newaxis, :], k)
+        exact_seconds += time.perf_counter() - started
+
+        started = time.perf_counter()
+        approximate, _ = index.search(vectors, row, k, n_probe)
+        ann_seconds += time.perf_counter() - started
+
+        hits += len(np.intersect1d(exact[0], approximate))
+
+    expected = len(sample) * min(k, n_items - 1)
+    return {
+        "recall_at_k": hits / expected if expected else 1.0,
+        "exact_ms": 1000 * exact_seconds / len(sample),
+        "ann_ms": 1000 * ann_seconds / len(sample),
+    }
@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+from datetime import datetime
+import json
+from pathlib import Path
+
+import numpy as np
+
+FORMAT_VERSION = 1
+
+
+def bundle_files(header_filename: str, array_names) -> list[str]:
+    """Return the header filename followed by the raw array filenames it points to."""
+    stem = header_filename.removesuffix(".json")
+    return [header_filename] + [f"{stem}.{name}.npy" for name in array_names]
+
+
+def save_bundle(header_path, arrays: dict[str, np.ndarray], **fields) -> list[Path]:
+    """Write each array as a raw ``.npy`` file plus a small JSON header.
+
+    Extra keyword ``fields`` are stored in the header. Returns the written
+    paths, header first. The header is written last so a reader never sees it
+    pointing at half-written arrays.
+    """
+    header_path = Path(header_path)
+    header_path.parent.mkdir(parents=True, exist_ok=True)
+    filenames = bundle_files(header_path.name, arrays)
+
+    specs = {}
+    paths = [header_path]
+    for (name, array), filename in zip(arrays.items(), filenames[1:]):
+        array = np.ascontiguousarray(array)
+        np.save(header_path.parent / filename, array)
+        specs[name] = {"file": filename, "dtype": str(array.dtype), "shape": list(array.shape)}
+        paths.append(header_path.parent / filename)
+
+    header = {
+        "format_version": FORMAT_VERSION,
+        "version": fields.pop("version", None) or datetime.now().strftime("%Y-%m-%dT%H:%M:%S"),
+        **fields,
+        "arrays": specs,
+    }
+    with open(header_path, "w", encoding="utf-8") as f:
+        json.dump(header, f, indent=2)
+
+    return paths
+
+
+def load_bundle(header_path, mmap: bool = True) -> tuple[dict, dict[str, np.ndarray]]:
+    """Read a bundle written by ``save_bundle``, memory-mapping the arrays by default."""
+    header_path = Path(header_path)
+    with open(header_path, "r", encoding="utf-8") as f:
+        header = json.load(f)
+
+    if header.get("format_version") != FORMAT_VERSION:
+        raise ValueError(f"Unsupported array bundle format in {header_path}: {header.get('format_version')}")
+
+    mmap_mode = "r" if mmap else None
+    arrays = {
+        name: np.load(header_path.parent / spec["file"], mmap_mode=mmap_mode)
+        for name, spec in header["arrays"].items()
+    }
+    return header, arrays
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from manga_recs.models.neighbor_index import NeighborIndex
+from manga_recs.models.vectors import top_k_per_row
+
+
+def interaction_matrix(user_features: pd.DataFrame) -> tuple[np.ndarray, sparse.csr_matrix]:
+    """Return (item ids, users x items CSR of interaction strength) from user features.
+
+    Items are columns in ascending id order. Zero or missing strengths are
+    dropped so the matrix only stores real signal.
+    """
+    frame = user_features[['userId', 'mediaId', 'interaction_strength']].dropna()
+    frame = frame[frame['interaction_strength'] > 0]
+
+    user_ids, user_rows = np.unique(frame['userId'].to_numpy(dtype=np.int64), return_inverse=True)
+    item_ids, item_cols = np.unique(frame['mediaId'].to_numpy(dtype=np.int64), return_inverse=True)
+
+    # Duplicate (user, item) pairs are summed by the COO -> CSR conversion
+    matrix = sparse.coo_matrix(
+        (frame['interaction_strength'].to_numpy(dtype=np.float32), (user_rows, item_cols)),
+        shape=(len(user_ids), len(item_ids)),
+    ).tocsr()
+    return item_ids, matrix
+
+
+def build_collaborative_index(matrix: sparse.csr_matrix, item_ids, k: int, chunk_size: int = 2048) -> NeighborIndex:
+    """Top-``k`` item-item cosine neighbours from a users x items interaction matrix.
+
+    Item columns are L2-normalized, then similarities are computed for
+    ``chunk_size`` items at a time as a sparse (chunk x users) @ (users x items)
+    product. Only each chunk's top-k survives, so memory stays around
+    chunk_size * N for the scratch block plus N * k for the result instead of
+    N * N. Pairs that never co-occur score -inf and are never recommended.
+    """
+    n_items = matrix.shape[1]
+    k = max(min(k, n_items - 1), 0)
+
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=0)).ravel())
+    normalized = (matrix @ sparse.diags(1 / np.where(norms == 0, 1, norms)).astype(np.float32)).tocsc()
+    items_by_users = normalized.T.tocsr()
+
+    neighbors = np.empty((n_items, k), dtype=np.int32)
+    scores = np.empty((n_items, k), dtype=np.float32)
+    for start in range(0, n_items, chunk_size):
+        end = min(start + chunk_size, n_items)
+        co_occurrence = (items_by_users[start:end] @ normalized).tocsr()
+
+        block = np.full((end - start, n_items), -np.inf, dtype=np.float32)
+        block_rows = np.repeat(np.arange(end - start), np.diff(co_occurrence.indptr))
+        block[block_rows, co_occurrence.indices] = co_occurrence.data
+        block[np.arange(end - start), np.arange(start, end)] = -np.inf  # never its own neighbour
+
+        neighbors[start:end], scores[start:end] = top_k_per_row(block, k)
+
+    return NeighborIndex.from_arrays(item_ids, neighbors, scores)
@@ -0,0 +1,223 @@
+from __future__ import annotations
+
+import time
+from typing import Callable
+
+import mlflow
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from manga_recs.common.constants import (
+    CLEANED_STATUS,
+    CLEANED_USER_READDATA_PARQUET,
+    MODELS_STATUS,
+    NEIGHBOR_INDEX_FILENAME,
+)
+from manga_recs.common.settings import settings
+from manga_recs.data.load.s3 import s3_load
+from manga_recs.data.transform import create_user_features
+from manga_recs.models.collaborative import build_collaborative_index
+from manga_recs.models.neighbor_index import NeighborIndex, neighbor_index_files
+from manga_recs.models.vectors import top_k_per_row
+
+
+def holdout_split(
+    user_features: pd.DataFrame,
+    item_ids: np.ndarray,
+    holdout_fraction: float = 0.2,
+    min_interactions: int = 5,
+    seed: int = 0,
+) -> tuple[sparse.csr_matrix, sparse.csr_matrix]:
+    """Split every user's interactions into (train, test) users x items CSR matrices.
+
+    Columns are rows of the id-sorted ``item_ids``; interactions with items
+    outside it are dropped. Users with at least ``min_interactions`` get a
+    random ``holdout_fraction`` (at least one) of their items moved to test;
+    everyone else keeps all of theirs in train. Values are interaction strength.
+    """
+    frame = user_features[['userId', 'mediaId', 'interaction_strength']].dropna()
+    frame = frame[frame['interaction_strength'] > 0]
+    item_ids = np.asarray(item_ids, dtype=np.int64)
+    media = frame['mediaId'].to_numpy(dtype=np.int64)
+    cols = np.minimum(np.searchsorted(item_ids, media), len(item_ids) - 1)
+    known = item_ids[cols] == media
+
+    user_ids, users = np.unique(frame['userId'].to_numpy(dtype=np.int64)[known], return_inverse=True)
+
+    # One entry per (user, item); repeated reads add up, as in ``interaction_matrix``
+    pairs, inverse = np.unique(users * len(item_ids) + cols[known], return_inverse=True)
+    weights = np.bincount(inverse, weights=frame['interaction_strength'].to_numpy(dtype=np.float64)[known])
+    users, cols, weights = pairs // len(item_ids), pairs % len(item_ids), weights.astype(np.float32)
+
+    # Shuffle within each user, then hold out the first n_test positions of every user
+    rng = np.random.default_rng(seed)
+    order = np.lexsort((rng.random(len(users)), users))
+    users, cols, weights = users[order], cols[order], weights[order]
+    counts = np.bincount(users, minlength=len(user_ids))
+    starts = np.cumsum(counts) - counts
+    rank = np.arange(len(users)) - starts[users]
+    n_test = np.where(counts >= min_interactions, np.maximum(1, (counts * holdout_fraction).astype(np.int64)), 0)
+    is_test = rank < n_test[users]
+
+    def _matrix(selected):
+        return sparse.csr_matrix(
+            (weights[selected], (users[selected], cols[selected])),
+            shape=(len(user_ids), len(item_ids)),
+        )
+
+    return _matrix(~is_test), _matrix(is_test)
+
+
+def _densify(scores: sparse.csr_matrix) -> np.ndarray:
+    """Dense copy of a sparse score block where entries that were never computed are -inf."""
+    dense = np.full(scores.shape, -np.inf, dtype=np.float32)
+    rows = np.repeat(np.arange(scores.shape[0]), np.diff(scores.indptr))
+    dense[rows, scores.indices] = scores.data
+    return dense
+
+
+def neighbor_scorer(index: NeighborIndex) -> Callable[[sparse.csr_matrix], np.ndarray]:
+    """Batched ``NeighborIndex.user_scores``: one (users x N) @ (N x N) sparse product per batch."""
+    graph = index.graph
+    return lambda profiles: _densify((profiles @ graph).tocsr())
+
+
+def blended_scorer(content, collaborative, weight: float) -> Callable[[sparse.csr_matrix], np.ndarray]:
+    """(1 - weight) * content + weight * collaborative; items neither reaches stay -inf."""
+    def score(profiles):
+        left, right = content(profiles), collaborative(profiles)
+        unreached = np.isneginf(left) & np.isneginf(right)
+        blended = (1 - weight) * np.nan_to_num(left, neginf=0.0) + weight * np.nan_to_num(right, neginf=0.0)
+        blended[unreached] = -np.inf
+        return blended
+
+    return score
+
+
+def popularity_scorer(train: sparse.csr_matrix) -> Callable[[sparse.csr_matrix], np.ndarray]:
+    """Baseline: every user gets the items with the most training interactions."""
+    popularity = train.getnnz(axis=0).astype(np.float32)
+    return lambda profiles: np.broadcast_to(popularity, (profiles.shape[0], len(popularity))).copy()
+
+
+def evaluate_scorer(
+    score: Callable[[sparse.csr_matrix], np.ndarray],
+    train: sparse.csr_matrix,
+    test: sparse.csr_matrix,
+    k: int,
+    batch_size: int = 1024,
+) -> dict:
+    """Recall@k, NDCG@k and catalog coverage over every user with held-out items.
+
+    Users are scored ``batch_size`` at a time: one dense (batch x items) score
+    block, training items masked out, one top-k selection, and hits found by
+    binary search of the flattened (user, item) test keys, with no per-user
+    Python loop. Recall divides by the number of held-out items, NDCG uses
+    binary relevance, coverage is the share of items recommended to anyone.
+    """
+    n_items = train.shape[1]
+    users = np.flatnonzero(test.getnnz(axis=1))
+    k = min(k, n_items)
+    discounts = 1 / np.log2(np.arange(2, k + 2))
+    ideal = np.cumsum(discounts)
+    recommended = np.zeros(n_items, dtype=bool)
+    recall_sum = ndcg_sum = 0.0
+
+    started = time.perf_counter()
+    for start in range(0, len(users), batch_size):
+        batch = users[start:start + batch_size]
+        profiles = train[batch]
+        scores = score(profiles)
+        scores[np.repeat(np.arange(len(batch)), np.diff(profiles.indptr)), profiles.indices] = -np.inf
+        top, top_scores = top_k_per_row(scores, k)
+        valid = np.isfinite(top_scores)
+
+        held_out = test[batch]
+        held_out.sort_indices()
+        keys = np.repeat(np.arange(len(batch), dtype=np.int64), np.diff(held_out.indptr)) * n_items + held_out.indices
+        candidates = np.arange(len(batch), dtype=np.int64)[:, np.newaxis] * n_items + top
+        positions = np.minimum(np.searchsorted(keys, candidates), len(keys) - 1)
+        hits = (keys[positions] == candidates) & valid
+
+        n_relevant = np.diff(held_out.indptr)
+        recall_sum += float((hits.sum(axis=1) / n_relevant).sum())
+        ndcg_sum += float(((hits @ discounts) / ideal[np.minimum(n_relevant, k) - 1]).sum())
+        recommended[top[valid]] = True
+    seconds = time.perf_counter() - started
+
+    n_users = len(users)
+    return {
+        "recall_at_k": recall_sum / n_users if n_users else 0.0,
+        "ndcg_at_k": ndcg_sum / n_users if n_users else 0.0,
+        "coverage": float(recommended.mean()) if n_items else 0.0,
+        "users": n_users,
+        "seconds": seconds,
+        "users_per_s": n_users / seconds if seconds else 0.0,
+    }
+
+
+def evaluate(model_version: str | None = None, k: int | None = None, batch_size: int | None = None) -> dict:
+    """Hold out part of each user's reads and measure how well each model ranks them.
+
+    The content model is the trained neighbor index (latest, or the dated
+    ``model_version``). The collaborative model is rebuilt from the training
+    split only, so held-out reads never leak into it. A popularity baseline is
+    always included. Every model's metrics and users/second go to MLflow.
+    """
+    evaluation = settings.evaluation
+    k = k or evaluation.k
+    batch_size = batch_size or evaluation.batch_size
+
+    mlflow.set_experiment(settings.mlflow.experiment_name)
+    with mlflow.start_run(run_name="offline_evaluation"):
+        mlflow.log_param("k", k)
+        mlflow.log_param("holdout_fraction", evaluation.holdout_fraction)
+        mlflow.log_param("min_interactions", evaluation.min_interactions)
+        mlflow.log_param("batch_size", batch_size)
+
+        print("Loading neighbor index and read data from S3")
+        paths = [
+            s3_load(name, bucket=settings.s3.bucket, status=MODELS_STATUS, version=model_version)
+            for name in neighbor_index_files(NEIGHBOR_INDEX_FILENAME)
+        ]
+        content = NeighborIndex.load(paths[0])
+        mlflow.log_param("model_version", content.version)
+        reads_path = s3_load(CLEANED_USER_READDATA_PARQUET, bucket=settings.s3.bucket, status=CLEANED_STATUS)
+        user_features = create_user_features(pd.read_parquet(reads_path))
+
+        train, test = holdout_split(
+            user_features,
+            content.ids,
+            holdout_fraction=evaluation.holdout_fraction,
+            min_interactions=evaluation.min_interactions,
+            seed=evaluation.seed,
+        )
+        mlflow.log_metric("num_users", train.shape[0])
+        mlflow.log_metric("num_items", train.shape[1])
+        mlflow.log_metric("train_interactions", train.nnz)
+        mlflow.log_metric("test_interactions", test.nnz)
+        print(f"{train.shape[0]} users, {train.nnz} training and {test.nnz} held-out interactions")
+
+        scorers = {"popularity": popularity_scorer(train), "content": neighbor_scorer(content)}
+        if settings.collaborative.enabled:
+            print("Building collaborative index from the training split...")
+            collaborative = build_collaborative_index(
+                train, content.ids, settings.recommendation.neighbor_k, chunk_size=settings.collaborative.chunk_size
+            )
+            scorers["collaborative"] = neighbor_scorer(collaborative)
+            weight = settings.recommendation.collaborative_weight
+            if 0 < weight < 1:
+                scorers["hybrid"] = blended_scorer(scorers["content"], scorers["collaborative"], weight)
+
+        results = {}
+        for name, score in scorers.items():
+            results[name] = evaluate_scorer(score, train, test, k, batch_size=batch_size)
+            result = results[name]
+            print(
+                f"{name:>13}: recall@{k}={result['recall_at_k']:.4f} ndcg@{k}={result['ndcg_at_k']:.4f} "
+                f"coverage={result['coverage']:.3f} ({result['users_per_s']:.0f} users/s)"
+            )
+            mlflow.log_metrics({f"{name}/{metric}": value for metric, value in result.items()})
+
+    return results
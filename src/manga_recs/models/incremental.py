@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import numpy as np
+from scipy import sparse
+
+from manga_recs.models.neighbor_index import NeighborIndex, top_k_rows
+from manga_recs.models.vectors import dot_scores, top_k_per_row
+
+
+class IncrementalUpdateError(ValueError):
+    """The previous artifacts cannot be patched; a full rebuild is needed."""
+
+
+def _rows_differ(left, right) -> np.ndarray:
+    if sparse.issparse(left) or sparse.issparse(right):
+        return (sparse.csr_matrix(left) != sparse.csr_matrix(right)).getnnz(axis=1) > 0
+    return np.any(np.asarray(left) != np.asarray(right), axis=1)
+
+
+def _pad_columns(vectors, n_columns: int):
+    if sparse.issparse(vectors):
+        vectors = sparse.csr_matrix(vectors)
+        return sparse.csr_matrix((vectors.data, vectors.indices, vectors.indptr), shape=(vectors.shape[0], n_columns))
+    vectors = np.asarray(vectors)
+    return np.pad(vectors, ((0, 0), (0, n_columns - vectors.shape[1])))
+
+
+def diff_items(prev_ids, prev_vectors, ids, vectors) -> dict[str, np.ndarray]:
+    """Ids added, removed and changed (different vector) between two id-sorted item sets."""
+    _, prev_rows, rows = np.intersect1d(prev_ids, ids, assume_unique=True, return_indices=True)
+    changed = _rows_differ(prev_vectors[prev_rows], vectors[rows])
+    return {
+        "added": np.setdiff1d(ids, prev_ids, assume_unique=True),
+        "removed": np.setdiff1d(prev_ids, ids, assume_unique=True),
+        "changed": np.asarray(ids)[rows[changed]],
+    }
+
+
+def update_neighbor_index(
+    previous: NeighborIndex,
+    prev_ids: np.ndarray,
+    prev_vectors,
+    ids: np.ndarray,
+    vectors,
+    k: int,
+    block_size: int = 1024,
+    max_rescore_fraction: float = 0.5,
+) -> tuple[NeighborIndex, dict]:
+    """Patch a previous top-K index for a new id-sorted set of unit vectors.
+
+    Rows of added or changed items, and of unchanged items whose old list
+    pointed at a removed or changed item, are rescored against everything.
+    Every other row keeps its old list and is only scored against the added
+    and changed items, then merged; an item outside its old top-K cannot
+    have become closer, so the result is exact.
+
+    Rows are compared column by column, so the features must be encoded into
+    the previous layout (``create_manga_features(previous=...)``); columns
+    appended since then are zero for the previous vectors.
+
+    Raises ``IncrementalUpdateError`` when a full rebuild is required or
+    cheaper (K differs, columns were removed, or more than
+    ``max_rescore_fraction`` of the rows would be rescored anyway).
+    """
+    ids = np.asarray(ids, dtype=np.int64)
+    vectors = vectors.astype(np.float32, copy=False) if sparse.issparse(vectors) else np.asarray(vectors, dtype=np.float32)
+    n_items = len(ids)
+    k = max(min(k, n_items - 1), 0)
+
+    if previous.k != k or len(previous) < 2:
+        raise IncrementalUpdateError(f"Previous index has K={previous.k}, need K={k}")
+    if prev_vectors.shape[1] > vectors.shape[1]:
+        raise IncrementalUpdateError("Feature dimensions shrank")
+    if prev_vectors.shape[1] < vectors.shape[1]:
+        # Columns appended since (new tags); previous items are zero in them
+        prev_vectors = _pad_columns(prev_vectors, vectors.shape[1])
+    if not np.array_equal(previous.ids, prev_ids):
+        raise IncrementalUpdateError("Previous index and item vectors were not built together")
+
+    diff = diff_items(previous.ids, prev_vectors, ids, vectors)
+
+    # Map each unchanged previous row to its new row; removed/changed items map to -1
+    _, prev_rows, new_rows = np.intersect1d(previous.ids, ids, assume_unique=True, return_indices=True)
+    stable = ~np.isin(ids[new_rows], diff["changed"])
+    old_to_new = np.full(len(previous), -1, dtype=np.int64)
+    old_to_new[prev_rows[stable]] = new_rows[stable]
+
+    affected = np.ones(n_items, dtype=bool)
+    affected[new_rows[stable]] = False
+    affected_rows = np.flatnonzero(affected)
+
+    # Unchanged rows whose old top-K lost an entry must be rescored in full
+    mapped = old_to_new[np.asarray(previous.neighbors)[prev_rows[stable]]]
+    lost = np.any(mapped < 0, axis=1)
+    rescore = np.union1d(affected_rows, new_rows[stable][lost])
+    patch_rows = new_rows[stable][~lost]
+    patch_neighbors = mapped[~lost]
+    patch_scores = np.asarray(previous.scores)[prev_rows[stable]][~lost]
+
+    if len(rescore) > max_rescore_fraction * n_items:
+        raise IncrementalUpdateError(f"{len(rescore)} of {n_items} rows would be rescored")
+
+    neighbors = np.empty((n_items, k), dtype=np.int32)
+    scores = np.empty((n_items, k), dtype=np.float32)
+    if len(rescore):
+        neighbors[rescore], scores[rescore] = top_k_rows(vectors, rescore, k, block_size=block_size)
+
+    # Merge each kept list with scores against the added/changed items only
+    for start in range(0, len(patch_rows), block_size):
+        rows = patch_rows[start:start + block_size]
+        new_scores = dot_scores(vectors[rows], vectors[affected_rows])
+        candidates = np.concatenate([patch_neighbors[start:start + block_size], np.broadcast_to(affected_rows, new_scores.shape)], axis=1)
+        merged = np.concatenate([patch_scores[start:start + block_size], new_scores], axis=1)
+        top, scores[rows] = top_k_per_row(merged, k)
+        neighbors[rows] = np.take_along_axis(candidates, top, axis=1)
+
+    stats = {
+        "added": len(diff["added"]),
+        "removed": len(diff["removed"]),
+        "changed": len(diff["changed"]),
+        "rescored_rows": len(rescore),
+        "patched_rows": len(patch_rows),
+    }
+    return NeighborIndex.from_arrays(ids, neighbors, scores), stats
+
+
+def compare_indexes(incremental: NeighborIndex, full: NeighborIndex, atol: float = 1e-5) -> dict:
+    """Check an incrementally updated index against a full rebuild.
+
+    Scores must agree within ``atol``; neighbour ids may only differ where
+    scores tie, so neighbour agreement is reported rather than required.
+    """
+    same_ids = np.array_equal(incremental.ids, full.ids)
+    max_diff = float(np.max(np.abs(incremental.scores - full.scores), initial=0.0)) if same_ids else float("inf")
+    agreement = float(np.mean(incremental.neighbors == full.neighbors)) if same_ids and full.neighbors.size else 1.0
+    return {"max_abs_diff": max_diff, "neighbor_agreement": agreement, "match": same_ids and max_diff <= atol}
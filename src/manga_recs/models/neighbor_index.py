@@ -0,0 +1,236 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from functools import cached_property
+from pathlib import Path
+
+import numpy as np
+from scipy import sparse
+
+from manga_recs.models.array_bundle import bundle_files, load_bundle, save_bundle
+from manga_recs.models.vectors import dot_scores, top_k_per_row
+
+ARRAY_NAMES = ("ids", "neighbors", "scores")
+# The neighbor lists as CSR arrays, written at train time so serving can memory-map them
+GRAPH_ARRAY_NAMES = ("graph_data", "graph_indices", "graph_indptr")
+
+
+def neighbor_index_files(header_filename: str) -> list[str]:
+    """Return the header filename followed by the raw array filenames it points to."""
+    return bundle_files(header_filename, ARRAY_NAMES + GRAPH_ARRAY_NAMES)
+
+
+def _graph_arrays(neighbors: np.ndarray, scores: np.ndarray) -> dict[str, np.ndarray]:
+    """CSR arrays of the neighbor lists; -inf (padding, never co-occurring) entries are left out."""
+    n_items = neighbors.shape[0]
+    scores = np.asarray(scores, dtype=np.float32)
+    keep = np.isfinite(scores)
+    indptr = np.concatenate([[0], np.cumsum(keep.sum(axis=1))])
+    graph = sparse.csr_matrix(
+        (scores[keep], np.asarray(neighbors)[keep], indptr),
+        shape=(n_items, n_items),
+    )
+    # Arrays in the dtypes scipy picks for this shape, so loading them back does not cast (copy)
+    return {"graph_data": graph.data, "graph_indices": graph.indices, "graph_indptr": graph.indptr}
+
+
+@dataclass(frozen=True)
+class NeighborIndex:
+    """Top-K nearest neighbours for every manga.
+
+    Rows are ordered by ascending manga id. ``neighbors[row]`` holds the row
+    positions (into ``ids``) of the K most similar manga for ``ids[row]``,
+    sorted by descending score, and ``scores[row]`` holds the matching cosine
+    similarities.
+
+    The arrays may be read-only memory maps, in which case every process that
+    loads the same files shares one page-cache copy. That includes
+    ``graph_arrays``, the CSR form of the lists written by ``save``; indexes
+    built in memory derive it on first use instead.
+    """
+
+    ids: np.ndarray
+    neighbors: np.ndarray
+    scores: np.ndarray
+    version: str = ""
+    graph_arrays: dict[str, np.ndarray] | None = field(default=None, repr=False, compare=False)
+
+    @classmethod
+    def from_arrays(cls, ids, neighbors, scores, version: str = "") -> "NeighborIndex":
+        ids = np.asarray(ids, dtype=np.int64)
+        neighbors = np.asarray(neighbors, dtype=np.int32)
+        scores = np.asarray(scores, dtype=np.float32)
+
+        # Keep rows sorted by id so lookups are a binary search, not a dict
+        if len(ids) > 1 and np.any(ids[1:] < ids[:-1]):
+            order = np.argsort(ids, kind="stable")
+            new_row = np.empty_like(order)
+            new_row[order] = np.arange(len(order))
+            ids = ids[order]
+            neighbors = new_row[neighbors[order]].astype(np.int32)
+            scores = scores[order]
+
+        return cls(
+            ids=np.ascontiguousarray(ids),
+            neighbors=np.ascontiguousarray(neighbors),
+            scores=np.ascontiguousarray(scores),
+            version=version,
+        )
+
+    @property
+    def k(self) -> int:
+        return self.neighbors.shape[1]
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __contains__(self, manga_id) -> bool:
+        return self.row_for(manga_id) is not None
+
+    def row_for(self, manga_id) -> int | None:
+        """Return the row of ``manga_id``, or None if it is not indexed."""
+        row = int(np.searchsorted(self.ids, int(manga_id)))
+        if row < len(self.ids) and self.ids[row] == int(manga_id):
+            return row
+        return None
+
+    def rows_for(self, manga_ids) -> tuple[np.ndarray, np.ndarray]:
+        """Vectorized ``row_for``: return (rows, found mask) for an array of ids."""
+        manga_ids = np.asarray(manga_ids, dtype=np.int64)
+        rows = np.searchsorted(self.ids, manga_ids)
+        rows = np.minimum(rows, len(self.ids) - 1)
+        found = self.ids[rows] == manga_ids if len(self.ids) else np.zeros(len(manga_ids), dtype=bool)
+        return rows, found
+
+    def top_n_rows(self, row: int, top_n: int) -> tuple[np.ndarray, np.ndarray]:
+        """Return (neighbor rows, scores) of the ``top_n`` nearest neighbours of ``row``."""
+        return self.neighbors[row, :top_n], self.scores[row, :top_n]
+
+    def top_n(self, manga_id, top_n: int) -> tuple[np.ndarray, np.ndarray]:
+        """Return (neighbor ids, scores) of the ``top_n`` most similar manga."""
+        row = self.row_for(manga_id)
+        if row is None:
+            raise KeyError(manga_id)
+        neighbors, scores = self.top_n_rows(row, top_n)
+        return self.ids[neighbors], scores
+
+    def top_n_batch(self, rows, top_n: int) -> tuple[np.ndarray, np.ndarray]:
+        """Return (neighbor rows, scores), each ``(len(rows), top_n)``, for many rows at once.
+
+        All requested rows are gathered in one indexing operation and the
+        top-N is picked with a single ``argpartition`` across the batch.
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        scores = np.asarray(self.scores[rows])
+        neighbors = np.asarray(self.neighbors[rows])
+        top_n = min(top_n, self.k)
+
+        if 0 < top_n < self.k:
+            top = np.argpartition(-scores, top_n - 1, axis=1)[:, :top_n]
+            scores = np.take_along_axis(scores, top, axis=1)
+            neighbors = np.take_along_axis(neighbors, top, axis=1)
+        else:
+            scores, neighbors = scores[:, :top_n], neighbors[:, :top_n]
+
+        order = np.argsort(-scores, axis=1, kind="stable")
+        scores = np.take_along_axis(scores, order, axis=1)
+        neighbors = np.take_along_axis(neighbors, order, axis=1)
+        return neighbors, scores
+
+    @cached_property
+    def graph(self) -> sparse.csr_matrix:
+        """The neighbor lists as a sparse N x N item-item similarity matrix.
+
+        Wraps the (possibly memory-mapped) ``graph_arrays`` without copying
+        them; only pairs with a finite score are stored.
+        """
+        arrays = self.graph_arrays if self.graph_arrays is not None else _graph_arrays(self.neighbors, self.scores)
+        return sparse.csr_matrix(
+            (arrays["graph_data"], arrays["graph_indices"], arrays["graph_indptr"]),
+            shape=(len(self), len(self)),
+            copy=False,
+        )
+
+    def user_scores(self, rows, weights) -> np.ndarray:
+        """Sum of ``weights``-weighted neighbor similarities for every item.
+
+        One sparse (1 x N) by (N x N) product; only items that are a neighbour
+        of something in ``rows`` get a finite score, the rest are -inf.
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        profile = sparse.csr_matrix(
+            (np.asarray(weights, dtype=np.float32), (np.zeros(len(rows), dtype=np.int64), rows)),
+            shape=(1, len(self)),
+        )
+        summed = (profile @ self.graph).tocsr()
+        scores = np.full(len(self), -np.inf, dtype=np.float32)
+        scores[summed.indices] = summed.data
+        return scores
+
+    def save(self, header_path) -> list[Path]:
+        """Write the arrays as raw ``.npy`` files plus a small JSON header."""
+        arrays = {name: getattr(self, name) for name in ARRAY_NAMES}
+        arrays.update(self.graph_arrays if self.graph_arrays is not None else _graph_arrays(self.neighbors, self.scores))
+        return save_bundle(header_path, arrays, version=self.version, n_items=len(self), k=self.k)
+
+    @classmethod
+    def load(cls, header_path, mmap: bool = True) -> "NeighborIndex":
+        """Open an index written by ``save``, memory-mapping the arrays by default."""
+        header, arrays = load_bundle(header_path, mmap=mmap)
+        # Bundles written before the graph arrays were added derive the graph on first use
+        graph_arrays = {name: arrays.pop(name) for name in GRAPH_ARRAY_NAMES if name in arrays} or None
+        return cls(version=header["version"], graph_arrays=graph_arrays, **arrays)
+
+
+def build_neighbor_index(sim_matrix: np.ndarray, ids, k: int) -> NeighborIndex:
+    """Keep the top-``k`` neighbours of each row of a dense similarity matrix."""
+    sim = np.array(sim_matrix, dtype=np.float32)
+    n_items = sim.shape[0]
+    k = max(min(k, n_items - 1), 0)
+
+    # Never recommend an item as its own neighbour
+    np.fill_diagonal(sim, -np.inf)
+
+    if k == 0:
+        empty = np.empty((n_items, 0))
+        return NeighborIndex.from_arrays(ids, empty, empty)
+
+    top = np.argpartition(-sim, k - 1, axis=1)[:, :k]
+    top_scores = np.take_along_axis(sim, top, axis=1)
+
+    order = np.argsort(-top_scores, axis=1, kind="stable")
+    neighbors = np.take_along_axis(top, order, axis=1)
+    scores = np.take_along_axis(top_scores, order, axis=1)
+
+    return NeighborIndex.from_arrays(ids, neighbors, scores)
+
+
+def top_k_rows(vectors, rows, k: int, block_size: int = 1024) -> tuple[np.ndarray, np.ndarray]:
+    """Exact top-``k`` (neighbor rows, scores) of ``vectors[rows]`` against every row, in blocks.
+
+    ``vectors`` may be dense or CSR; each block's scores are dense either way.
+    """
+    rows = np.asarray(rows, dtype=np.int64)
+    neighbors = np.empty((len(rows), k), dtype=np.int32)
+    scores = np.empty((len(rows), k), dtype=np.float32)
+    for start in range(0, len(rows), block_size):
+        block_rows = rows[start:start + block_size]
+        block = dot_scores(vectors[block_rows], vectors)
+        block[np.arange(len(block_rows)), block_rows] = -np.inf  # never its own neighbour
+        neighbors[start:start + len(block_rows)], scores[start:start + len(block_rows)] = top_k_per_row(block, k)
+    return neighbors, scores
+
+
+def build_neighbor_index_blocked(vectors, ids, k: int, block_size: int = 1024) -> NeighborIndex:
+    """Top-``k`` cosine neighbours of unit-length float32 rows, one row block at a time.
+
+    Each block of ``block_size`` rows is scored against the whole matrix and
+    cut down to its top-k before the next block, so peak memory is about
+    block_size * N + N * k floats instead of the N * N dense matrix. Sparse
+    (CSR) rows are scored straight from their non-zeros.
+    """
+    vectors = vectors.astype(np.float32, copy=False) if sparse.issparse(vectors) else np.asarray(vectors, dtype=np.float32)
+    n_items = vectors.shape[0]
+    k = max(min(k, n_items - 1), 0)
+    neighbors, scores = top_k_rows(vectors, np.arange(n_items), k, block_size=block_size)
+    return NeighborIndex.from_arrays(ids, neighbors, scores)
@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import os
+import time
+
+import numpy as np
+from scipy import sparse
+
+from manga_recs.models.neighbor_index import NeighborIndex
+from manga_recs.models.vectors import dot_scores, top_k_per_row
+
+# Per-process view of the shared vector matrix, set by the pool initializer
+_vectors = None
+_shm: list[shared_memory.SharedMemory] = []
+
+
+def resolve_workers(workers: int) -> int:
+    """0 or less means one worker per CPU."""
+    return workers if workers > 0 else (os.cpu_count() or 1)
+
+
+def _attach(specs: list[tuple[str, tuple, str]], matrix_shape: tuple | None, blas_threads: int) -> None:
+    global _vectors, _shm
+    # Pool workers share the parent's resource tracker; the parent alone unlinks the blocks
+    _shm = [shared_memory.SharedMemory(name=name) for name, _, _ in specs]
+    arrays = [np.ndarray(shape, dtype=dtype, buffer=shm.buf) for shm, (_, shape, dtype) in zip(_shm, specs)]
+    if matrix_shape is None:
+        _vectors = arrays[0]
+    else:
+        _vectors = sparse.csr_matrix(tuple(arrays), shape=matrix_shape, copy=False)
+
+    # Keep workers x BLAS threads within the machine instead of oversubscribing it
+    from threadpoolctl import threadpool_limits
+
+    threadpool_limits(limits=blas_threads)
+
+
+def _top_k_block(start: int, end: int, k: int) -> tuple[int, np.ndarray, np.ndarray, int, float]:
+    started = time.perf_counter()
+    block = dot_scores(_vectors[start:end], _vectors)
+    block[np.arange(end - start), np.arange(start, end)] = -np.inf  # never its own neighbour
+    neighbors, scores = top_k_per_row(block, k)
+    return start, neighbors, scores, os.getpid(), time.perf_counter() - started
+
+
+def build_neighbor_index_parallel(
+    vectors,
+    ids,
+    k: int,
+    block_size: int = 1024,
+    workers: int = 0,
+) -> tuple[NeighborIndex, dict]:
+    """Blocked top-``k`` neighbours with row blocks spread over a process pool.
+
+    The unit-length float32 matrix (dense, or the three arrays of a CSR
+    matrix) is copied into shared memory once; workers map it read-only
+    instead of receiving a pickled copy, and only each block's (block x k)
+    result travels back. Returns the index and per-worker stats: rows, busy
+    seconds and rows/second for every worker process.
+    """
+    if sparse.issparse(vectors):
+        vectors = sparse.csr_matrix(vectors, dtype=np.float32)
+        arrays, matrix_shape = [vectors.data, vectors.indices, vectors.indptr], vectors.shape
+    else:
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        arrays, matrix_shape = [vectors], None
+    n_items = vectors.shape[0]
+    k = max(min(k, n_items - 1), 0)
+    workers = resolve_workers(workers)
+    blas_threads = max(1, (os.cpu_count() or 1) // workers)
+
+    blocks = []
+    try:
+        specs = []
+        for array in arrays:
+            shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+            blocks.append(shm)
+            np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)[:] = array
+            specs.append((shm.name, array.shape, array.dtype.str))
+
+        neighbors = np.empty((n_items, k), dtype=np.int32)
+        scores = np.empty((n_items, k), dtype=np.float32)
+        per_worker: dict[int, dict] = {}
+
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_attach,
+            initargs=(specs, matrix_shape, blas_threads),
+        ) as pool:
+            futures = [
+                pool.submit(_top_k_block, start, min(start + block_size, n_items), k)
+                for start in range(0, n_items, block_size)
+            ]
+            for future in futures:
+                start, block_neighbors, block_scores, pid, seconds = future.result()
+                neighbors[start:start + len(block_neighbors)] = block_neighbors
+                scores[start:start + len(block_scores)] = block_scores
+                stats = per_worker.setdefault(pid, {"rows": 0, "seconds": 0.0})
+                stats["rows"] += len(block_neighbors)
+                stats["seconds"] += seconds
+    finally:
+        for shm in blocks:
+            shm.close()
+            shm.unlink()
+
+    for stats in per_worker.values():
+        stats["rows_per_s"] = stats["rows"] / stats["seconds"] if stats["seconds"] else 0.0
+    return NeighborIndex.from_arrays(ids, neighbors, scores), per_worker
@@ -1,62 +1,271 @@
+import time
+import tracemalloc
+
 import pandas as pd
 import joblib
 import mlflow
 import numpy as np
 
 from manga_recs.common.constants import (
+    ANN_INDEX_FILENAME,
+    COLLAB_INDEX_FILENAME,
     COSINE_SIM_FILENAME,
     FEATURES_STATUS,
-    MANGA_FEATURES_PARQUET,
+    ITEM_VECTORS_FILENAME,
+    MANGA_FEATURES_FILENAME,
     MODELS_STATUS,
+    NEIGHBOR_INDEX_FILENAME,
+    USER_FEATURES_PARQUET,
 )
 from manga_recs.common.paths import MODELS_DIR
 from manga_recs.common.settings import settings
+from manga_recs.data.feature_matrix import FeatureMatrix, feature_files
 from manga_recs.data.load.s3 import s3_dump, s3_load
+from manga_recs.models.ann import IVFIndex, evaluate_recall
+from manga_recs.models.collaborative import build_collaborative_index, interaction_matrix
+from manga_recs.models.incremental import IncrementalUpdateError, compare_indexes, update_neighbor_index
+from manga_recs.models.neighbor_index import NeighborIndex, build_neighbor_index_blocked, neighbor_index_files
+from manga_recs.models.parallel import build_neighbor_index_parallel, resolve_workers
+from manga_recs.models.vectors import item_vectors, item_vectors_files, load_item_vectors, save_item_vectors, top_k_per_row
 from sklearn.metrics.pairwise import cosine_similarity
 
 # paths
-FEATURE_PATH = s3_load(MANGA_FEATURES_PARQUET, bucket=settings.s3.bucket, status=FEATURES_STATUS)
-MODELS_DIR.mkdir(parents=True, exist_ok=True)
 SIM_PATH = MODELS_DIR / COSINE_SIM_FILENAME
+NEIGHBOR_INDEX_PATH = MODELS_DIR / NEIGHBOR_INDEX_FILENAME
+ANN_INDEX_PATH = MODELS_DIR / ANN_INDEX_FILENAME
+COLLAB_INDEX_PATH = MODELS_DIR / COLLAB_INDEX_FILENAME
+ITEM_VECTORS_PATH = MODELS_DIR / ITEM_VECTORS_FILENAME
 
 
-def compute_cosine_similarity(df):
+def compute_cosine_similarity(features: FeatureMatrix):
+    """Exact dense N x N cosine similarity (float64); the reference for the blocked path."""
 
-    X = df.copy()
-    X = X.drop(columns=['id'])
+    X = features.matrix().astype(np.float64)
 
-    sim_matrix = cosine_similarity(X.values)
+    sim_matrix = cosine_similarity(X)
     np.fill_diagonal(sim_matrix, 0)  # Exclude self-similarity
 
-    cos_sim_df = pd.DataFrame(sim_matrix, index=df['id'], columns=df['id'])
+    cos_sim_df = pd.DataFrame(sim_matrix, index=features.ids, columns=features.ids)
 
     return cos_sim_df
 
 
-def train():
+def check_against_exact(features: FeatureMatrix, neighbor_index, n_rows: int, seed: int = 0) -> float:
+    """Max absolute difference between blocked top-K scores and the exact float64 path.
+
+    Re-scores a sample of rows with sklearn's ``cosine_similarity`` and
+    compares each row's sorted top-K scores.
+    """
+    values = features.sort_by_id().matrix().astype(np.float64)
+    n_items = values.shape[0]
+    rows = np.random.default_rng(seed).choice(n_items, size=min(n_rows, n_items), replace=False)
+
+    exact = cosine_similarity(values[rows], values)
+    exact[np.arange(len(rows)), rows] = -np.inf
+    _, exact_scores = top_k_per_row(exact, neighbor_index.k)
+    return float(np.max(np.abs(exact_scores - neighbor_index.scores[rows]), initial=0.0))
+
+
+def build_ann_index(ids, vectors):
+    """Build the IVF index over the feature vectors and log its recall against exact search."""
+    ann = settings.ann
+    mlflow.log_param("ann_n_probe", ann.n_probe)
+    mlflow.log_param("ann_kmeans_iters", ann.kmeans_iters)
+
+    ann_index = IVFIndex.build(ids, vectors, n_lists=ann.n_lists, n_iter=ann.kmeans_iters)
+    mlflow.log_param("ann_n_lists", ann_index.n_lists)
+
+    k = settings.recommendation.neighbor_k
+    evaluation = evaluate_recall(ann_index, vectors, k=k, n_probe=ann.n_probe, sample_size=ann.recall_sample)
+    print(
+        f"ANN recall@{k}: {evaluation['recall_at_k']:.3f} "
+        f"({evaluation['ann_ms']:.2f} ms/query vs {evaluation['exact_ms']:.2f} ms exact)"
+    )
+    for name, value in evaluation.items():
+        mlflow.log_metric(f"ann_{name}", value)
+
+    return ann_index
+
+
+def train_collaborative():
+    """Item-item similarity from user interactions, logged as a nested MLflow run."""
+    with mlflow.start_run(run_name="item_item_collaborative", nested=True):
+        mlflow.log_param("model_type", "item_item_collaborative")
+        mlflow.log_param("neighbor_k", settings.recommendation.neighbor_k)
+        mlflow.log_param("chunk_size", settings.collaborative.chunk_size)
+
+        print("Loading user features from S3")
+        user_path = s3_load(USER_FEATURES_PARQUET, bucket=settings.s3.bucket, status=FEATURES_STATUS)
+        item_ids, matrix = interaction_matrix(pd.read_parquet(user_path))
+        mlflow.log_metric("num_users", matrix.shape[0])
+        mlflow.log_metric("num_items", matrix.shape[1])
+        mlflow.log_metric("num_interactions", matrix.nnz)
+
+        print("Building item-item collaborative index...")
+        tracemalloc.start()
+        started = time.perf_counter()
+        collab_index = build_collaborative_index(
+            matrix, item_ids, settings.recommendation.neighbor_k, chunk_size=settings.collaborative.chunk_size
+        )
+        build_seconds = time.perf_counter() - started
+        _, peak_bytes = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        print(f"Built collaborative index in {build_seconds:.2f}s (peak {peak_bytes / 2**20:.1f} MiB)")
+        mlflow.log_metric("build_seconds", build_seconds)
+        mlflow.log_metric("peak_memory_mb", peak_bytes / 2**20)
+
+        for path in collab_index.save(COLLAB_INDEX_PATH):
+            mlflow.log_artifact(path)
+            s3_dump(str(path), path.name, bucket=settings.s3.bucket, status=MODELS_STATUS)
+        print("Uploaded collaborative index to S3.")
+
+
+def build_content_index(ids, vectors, workers: int):
+    """Blocked top-K neighbor index, in-process or over a worker pool; logs throughput."""
+    k = settings.recommendation.neighbor_k
+    block_size = settings.similarity.block_size
+    mlflow.log_param("block_size", block_size)
+    mlflow.log_param("workers", workers)
+
+    started = time.perf_counter()
+    if workers == 1:
+        neighbor_index = build_neighbor_index_blocked(vectors, ids, k, block_size=block_size)
+    else:
+        neighbor_index, per_worker = build_neighbor_index_parallel(vectors, ids, k, block_size=block_size, workers=workers)
+        for i, (pid, stats) in enumerate(sorted(per_worker.items())):
+            print(f"  worker {pid}: {stats['rows']} rows in {stats['seconds']:.2f}s ({stats['rows_per_s']:.0f} rows/s)")
+            mlflow.log_metric("worker_rows_per_s", stats["rows_per_s"], step=i)
+    build_seconds = time.perf_counter() - started
+
+    print(f"Built neighbor index for {len(ids)} items in {build_seconds:.2f}s with {workers} worker(s)")
+    mlflow.log_metric("build_seconds", build_seconds)
+    mlflow.log_metric("rows_per_s", len(ids) / build_seconds if build_seconds else 0.0)
+    return neighbor_index
+
+
+def load_previous_model() -> tuple[NeighborIndex, np.ndarray, np.ndarray]:
+    """Download the latest neighbor index and the item vectors it was built from."""
+    def _fetch(filenames):
+        return [s3_load(name, bucket=settings.s3.bucket, status=MODELS_STATUS, use_cache=False) for name in filenames]
+
+    previous = NeighborIndex.load(_fetch(neighbor_index_files(NEIGHBOR_INDEX_FILENAME))[0], mmap=False)
+    prev_ids, prev_vectors = load_item_vectors(_fetch(item_vectors_files(ITEM_VECTORS_FILENAME))[0], mmap=False)
+    return previous, prev_ids, prev_vectors
+
+
+def build_incremental_index(ids, vectors, verify: bool) -> NeighborIndex | None:
+    """Patch the previous neighbor index; None when a full rebuild is needed instead."""
+    k = settings.recommendation.neighbor_k
+    block_size = settings.similarity.block_size
+    try:
+        previous, prev_ids, prev_vectors = load_previous_model()
+    except Exception as e:
+        print(f"No usable previous model ({e}), rebuilding in full.")
+        return None
+
+    started = time.perf_counter()
+    try:
+        neighbor_index, stats = update_neighbor_index(
+            previous, prev_ids, prev_vectors, ids, vectors, k,
+            block_size=block_size, max_rescore_fraction=settings.similarity.max_rescore_fraction,
+        )
+    except IncrementalUpdateError as e:
+        print(f"Incremental update not possible, rebuilding in full: {e}")
+        return None
+    build_seconds = time.perf_counter() - started
+
+    print(
+        f"Incremental update in {build_seconds:.2f}s: {stats['added']} added, {stats['removed']} removed, "
+        f"{stats['changed']} changed; {stats['rescored_rows']} rows rescored, {stats['patched_rows']} patched"
+    )
+    mlflow.log_metric("build_seconds", build_seconds)
+    for name, value in stats.items():
+        mlflow.log_metric(f"incremental_{name}", value)
+
+    if verify:
+        full = build_neighbor_index_blocked(vectors, ids, k, block_size=block_size)
+        check = compare_indexes(neighbor_index, full)
+        print(f"Incremental vs full rebuild: max score difference {check['max_abs_diff']:.2e}, match={check['match']}")
+        mlflow.log_metric("incremental_max_abs_diff", check["max_abs_diff"])
+        mlflow.log_metric("incremental_neighbor_agreement", check["neighbor_agreement"])
+        if not check["match"]:
+            print("Incremental result differs from the full rebuild; keeping the full rebuild.")
+            return full
+
+    return neighbor_index
+
+
+def train(workers: int | None = None, incremental: bool | None = None, verify: bool | None = None):
 
     with mlflow.start_run():
         
         mlflow.set_experiment(settings.mlflow.experiment_name)
         mlflow.log_param("model_type", "cosine_similarity")
-        mlflow.log_param("feature_store", "s3_parquet")
+        mlflow.log_param("feature_store", "s3_array_bundle")
+        mlflow.log_param("neighbor_k", settings.recommendation.neighbor_k)
         
         print("Loading features from S3")
-        X = pd.read_parquet(FEATURE_PATH)
+        feature_paths = [
+            s3_load(name, bucket=settings.s3.bucket, status=FEATURES_STATUS) for name in feature_files(MANGA_FEATURES_FILENAME)
+        ]
+        X = FeatureMatrix.load(feature_paths[0])
+        mlflow.log_param("feature_version", X.version)
+        MODELS_DIR.mkdir(parents=True, exist_ok=True)
 
         mlflow.log_metric("num_items", X.shape[0])
         mlflow.log_metric("num_features", X.shape[1])
+        mlflow.log_metric("feature_density", X.nnz / max(X.shape[0] * X.shape[1], 1))
 
-        print("Computing similarity matrix...")
+        if settings.similarity.save_dense:
+            print("Computing similarity matrix...")
 
-        sim_matrix = compute_cosine_similarity(X)
+            sim_matrix = compute_cosine_similarity(X)
 
-        joblib.dump(sim_matrix, SIM_PATH)
+            joblib.dump(sim_matrix, SIM_PATH)
 
-        mlflow.log_artifact(SIM_PATH)
-        
-        s3_dump(str(SIM_PATH), COSINE_SIM_FILENAME, bucket=settings.s3.bucket, status=MODELS_STATUS)
-        print("Uploaded similarity matrix to S3.")
+            mlflow.log_artifact(SIM_PATH)
+
+            s3_dump(str(SIM_PATH), COSINE_SIM_FILENAME, bucket=settings.s3.bucket, status=MODELS_STATUS)
+            print("Uploaded similarity matrix to S3.")
+
+        # Normalize once in float32; every model below works on these rows
+        ids, vectors = item_vectors(X)
+
+        print("Building top-K neighbor index...")
+        incremental = settings.similarity.incremental if incremental is None else incremental
+        verify = settings.similarity.verify_incremental if verify is None else verify
+        neighbor_index = build_incremental_index(ids, vectors, verify) if incremental else None
+        mlflow.log_param("build_mode", "incremental" if neighbor_index is not None else "full")
+        if neighbor_index is None:
+            workers = resolve_workers(workers if workers is not None else settings.similarity.workers)
+            neighbor_index = build_content_index(ids, vectors, workers)
+
+        if settings.similarity.exact_check_rows > 0:
+            max_diff = check_against_exact(X, neighbor_index, settings.similarity.exact_check_rows)
+            print(f"Blocked top-K vs exact: max score difference {max_diff:.2e}")
+            mlflow.log_metric("exact_max_abs_diff", max_diff)
+
+        for path in neighbor_index.save(NEIGHBOR_INDEX_PATH):
+            mlflow.log_artifact(path)
+            s3_dump(str(path), path.name, bucket=settings.s3.bucket, status=MODELS_STATUS)
+        print("Uploaded neighbor index to S3.")
+
+        # The vectors behind this index, so the next run can update it incrementally
+        for path in save_item_vectors(ITEM_VECTORS_PATH, ids, vectors, version=neighbor_index.version):
+            mlflow.log_artifact(path)
+            s3_dump(str(path), path.name, bucket=settings.s3.bucket, status=MODELS_STATUS)
+
+        if settings.ann.enabled:
+            print("Building ANN index...")
+            ann_index = build_ann_index(ids, vectors)
+            for path in ann_index.save(ANN_INDEX_PATH):
+                mlflow.log_artifact(path)
+                s3_dump(str(path), path.name, bucket=settings.s3.bucket, status=MODELS_STATUS)
+            print("Uploaded ANN index to S3.")
+
+        if settings.collaborative.enabled:
+            train_collaborative()
 
         print("Training complete and logged!")
 
@@ -0,0 +1,94 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from manga_recs.data.feature_matrix import FeatureMatrix
+from manga_recs.models.array_bundle import bundle_files, load_bundle, save_bundle
+
+ARRAY_NAMES = ("ids", "data", "indices", "indptr")
+
+
+def l2_normalize(matrix):
+    """Return ``matrix`` as float32 with unit-length rows (all-zero rows stay zero).
+
+    Sparse input stays sparse (CSR); anything else comes back as a dense array.
+    """
+    if sparse.issparse(matrix):
+        matrix = sparse.csr_matrix(matrix, dtype=np.float32, copy=True)
+        norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1), dtype=np.float32).ravel())
+        matrix.data /= np.repeat(np.where(norms == 0, 1, norms), np.diff(matrix.indptr))
+        return matrix
+    matrix = np.array(matrix, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    matrix /= np.where(norms == 0, 1, norms)
+    return matrix
+
+
+def item_vectors(features: FeatureMatrix | pd.DataFrame) -> tuple[np.ndarray, sparse.csr_matrix]:
+    """Return (ids, L2-normalized float32 CSR vectors) from the features, sorted by id.
+
+    Dot products between these rows are cosine similarities, and the row
+    order matches the neighbor and ANN indexes. A dense feature frame is
+    accepted too and split into its numeric and multi-hot blocks first.
+    """
+    if isinstance(features, pd.DataFrame):
+        features = FeatureMatrix.from_frame(features)
+    features = features.sort_by_id()
+    return features.ids, l2_normalize(features.matrix())
+
+
+def dense_rows(vectors, rows) -> np.ndarray:
+    """``vectors[rows]`` as a dense array; a single row index gives a 1-D vector."""
+    selected = vectors[rows]
+    if sparse.issparse(selected):
+        selected = selected.toarray()
+        return selected.ravel() if np.ndim(rows) == 0 else selected
+    return np.asarray(selected)
+
+
+def dot_scores(left, right) -> np.ndarray:
+    """Dense ``left @ right.T`` for dense or CSR rows.
+
+    With a sparse ``right`` (usually the whole catalog) the few ``left`` rows
+    are densified and multiplied by the sparse matrix, which costs one pass
+    over its non-zeros instead of a sparse x sparse product with dense output.
+    """
+    if sparse.issparse(right):
+        left = left.toarray() if sparse.issparse(left) else np.asarray(left)
+        return np.ascontiguousarray(np.asarray(right @ left.T).T)
+    if sparse.issparse(left):
+        return np.asarray(left @ np.asarray(right).T)
+    return left @ np.asarray(right).T
+
+
+def top_k_per_row(scores: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+    """Return (column indexes, scores) of the ``k`` largest entries of each row, sorted descending."""
+    k = min(k, scores.shape[1])
+    if k <= 0:
+        return np.empty((scores.shape[0], 0), dtype=np.int64), np.empty((scores.shape[0], 0), dtype=scores.dtype)
+    top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    top_scores = np.take_along_axis(scores, top, axis=1)
+    order = np.argsort(-top_scores, axis=1, kind="stable")
+    return np.take_along_axis(top, order, axis=1), np.take_along_axis(top_scores, order, axis=1)
+
+
+def item_vectors_files(header_filename: str) -> list[str]:
+    return bundle_files(header_filename, ARRAY_NAMES)
+
+
+def save_item_vectors(header_path, ids: np.ndarray, vectors, version: str | None = None) -> list[Path]:
+    """Persist the normalized vectors a model was trained on, for incremental updates.
+
+    Vectors are stored as the three CSR arrays, dense input included.
+    """
+    vectors = sparse.csr_matrix(vectors, dtype=np.float32)
+    arrays = {"ids": ids, "data": vectors.data, "indices": vectors.indices, "indptr": vectors.indptr}
+    return save_bundle(header_path, arrays, version=version, n_items=len(ids), shape=list(vectors.shape))
+
+
+def load_item_vectors(header_path, mmap: bool = True) -> tuple[np.ndarray, sparse.csr_matrix]:
+    header, arrays = load_bundle(header_path, mmap=mmap)
+    vectors = sparse.csr_matrix((arrays["data"], arrays["indices"], arrays["indptr"]), shape=tuple(header["shape"]))
+    return arrays["ids"], vectors
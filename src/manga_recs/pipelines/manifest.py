@@ -0,0 +1,191 @@
+from __future__ import annotations
+
+from contextlib import contextmanager
+from datetime import datetime
+import json
+import os
+from pathlib import Path
+import resource
+import sys
+from threading import Event, Thread
+import time
+
+from manga_recs.common.settings import settings
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def _current_rss() -> int | None:
+    """Resident set size in bytes, read from /proc (None where unavailable)."""
+    try:
+        with open("/proc/self/statm", "r", encoding="ascii") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, IndexError, ValueError):
+        return None
+
+
+def _max_rss() -> int:
+    """Process lifetime peak RSS in bytes (ru_maxrss is KiB on Linux, bytes on macOS)."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class _PeakRssSampler:
+    """Polls RSS in a background thread to get a peak for one block of work.
+
+    ``ru_maxrss`` only ever grows, so on its own it cannot tell a small stage
+    that follows a large one apart from the large one. Falls back to it when
+    /proc is not available.
+    """
+
+    def __init__(self, interval: float = 0.02):
+        self.interval = interval
+        self.peak = _current_rss() or 0
+        self._stop = Event()
+        self._thread = Thread(target=self._run, name="rss-sampler", daemon=True)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            rss = _current_rss()
+            if rss is not None and rss > self.peak:
+                self.peak = rss
+
+    def __enter__(self) -> "_PeakRssSampler":
+        if _current_rss() is not None:
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join()
+            self.peak = max(self.peak, _current_rss() or 0)
+        else:
+            self.peak = _max_rss()
+
+
+def _file_size(path) -> int:
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+class StageMetrics:
+    """Timing, memory and I/O volume for one pipeline stage or step.
+
+    Stage functions report what they read and wrote via ``read``/``wrote``
+    and time inner steps with ``step``. A stage that is not part of a
+    manifest still works; its numbers are simply discarded.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.wall_s = 0.0
+        self.cpu_s = 0.0
+        self.peak_rss_mb = 0.0
+        self.rows_in = 0
+        self.rows_out = 0
+        self.bytes_read = 0
+        self.bytes_written = 0
+        self.steps: list[StageMetrics] = []
+
+    def read(self, path=None, rows: int = 0) -> None:
+        self.rows_in += rows
+        if path is not None:
+            self.bytes_read += _file_size(path)
+
+    def wrote(self, path=None, rows: int = 0) -> None:
+        self.rows_out += rows
+        if path is not None:
+            self.bytes_written += _file_size(path)
+
+    @contextmanager
+    def measure(self):
+        """Record wall time, process CPU time and peak RSS of the enclosed block."""
+        wall_started, cpu_started = time.perf_counter(), time.process_time()
+        with _PeakRssSampler() as sampler:
+            try:
+                yield self
+            finally:
+                self.wall_s += time.perf_counter() - wall_started
+                self.cpu_s += time.process_time() - cpu_started
+        self.peak_rss_mb = max(self.peak_rss_mb, sampler.peak / 2**20)
+
+    @contextmanager
+    def step(self, name: str, rows_in: int = 0):
+        """Measure a named step inside this stage, e.g. a single transform."""
+        step = StageMetrics(name)
+        step.rows_in = rows_in
+        self.steps.append(step)
+        with step.measure():
+            yield step
+
+    def to_dict(self) -> dict:
+        record = {
+            "name": self.name,
+            "wall_s": round(self.wall_s, 4),
+            "cpu_s": round(self.cpu_s, 4),
+            "peak_rss_mb": round(self.peak_rss_mb, 1),
+            "rows_in": self.rows_in,
+            "rows_out": self.rows_out,
+            "bytes_read": self.bytes_read,
+            "bytes_written": self.bytes_written,
+        }
+        if self.steps:
+            record["steps"] = [step.to_dict() for step in self.steps]
+        return record
+
+
+class RunManifest:
+    """Structured record of one pipeline run, written as JSON next to its outputs."""
+
+    def __init__(self, name: str = "pipeline"):
+        self.name = name
+        self.started_at = datetime.now()
+        self.run_id = f"{name}-{self.started_at.strftime('%Y%m%dT%H%M%S')}"
+        self.stages: list[StageMetrics] = []
+        self.status = "running"
+
+    @contextmanager
+    def stage(self, name: str):
+        stage = StageMetrics(name)
+        self.stages.append(stage)
+        try:
+            with stage.measure():
+                yield stage
+        except BaseException:
+            self.status = "failed"
+            raise
+
+    def to_dict(self) -> dict:
+        return {
+            "run_id": self.run_id,
+            "started_at": self.started_at.strftime("%Y-%m-%dT%H:%M:%S"),
+            "status": self.status,
+            "wall_s": round(sum(stage.wall_s for stage in self.stages), 4),
+            "stages": [stage.to_dict() for stage in self.stages],
+        }
+
+    def save(self, directory) -> Path:
+        path = Path(directory) / f"{self.run_id}.json"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2)
+        return path
+
+    def log_to_mlflow(self) -> None:
+        """Log every stage and step figure as an MLflow metric, e.g. ``clean/wall_s``."""
+        import mlflow
+
+        def _metrics(record: dict, prefix: str) -> dict:
+            metrics = {f"{prefix}/{key}": value for key, value in record.items() if key not in ("name", "steps")}
+            for step in record.get("steps", []):
+                metrics.update(_metrics(step, f"{prefix}/{step['name']}"))
+            return metrics
+
+        mlflow.set_experiment(settings.mlflow.experiment_name)
+        with mlflow.start_run(run_name=self.run_id):
+            mlflow.set_tag("pipeline_status", self.status)
+            for stage in self.to_dict()["stages"]:
+                mlflow.log_metrics(_metrics(stage, stage["name"]))
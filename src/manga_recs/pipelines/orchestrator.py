@@ -1,9 +1,37 @@
+from manga_recs.common.paths import DATA_DIR
+from manga_recs.common.settings import settings
 from manga_recs.data.cleaning import clean_data
 from manga_recs.data.features import build_features
 from manga_recs.data.ingestion import ingest_data
+from manga_recs.pipelines.manifest import RunManifest
 
+MANIFEST_DIR = DATA_DIR / "manifests"
 
-def run_pipeline():
-    ingest_data()
-    clean_data()
-    build_features()
\ No newline at end of file
+
+def run_pipeline(log_mlflow: bool | None = None, skip_ingest: bool = False):
+    """Run ingest -> clean -> features and write a run manifest next to the outputs.
+
+    The manifest (wall/CPU time, peak RSS, rows and bytes per stage) is saved
+    even when a stage fails. It is also logged to MLflow when ``log_mlflow``
+    (default ``pipeline.log_mlflow``) is set.
+    """
+    if log_mlflow is None:
+        log_mlflow = settings.pipeline.log_mlflow
+
+    manifest = RunManifest()
+    stages = [("clean", clean_data), ("features", build_features)]
+    if not skip_ingest:
+        stages.insert(0, ("ingest", ingest_data))
+
+    try:
+        for name, run_stage in stages:
+            with manifest.stage(name) as stage:
+                run_stage(stage=stage)
+        manifest.status = "succeeded"
+    finally:
+        path = manifest.save(MANIFEST_DIR)
+        print(f"Wrote run manifest to {path}")
+        if log_mlflow:
+            manifest.log_to_mlflow()
+
+    return manifest
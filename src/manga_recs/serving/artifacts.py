@@ -0,0 +1,291 @@
+from dataclasses import dataclass, field
+from datetime import datetime
+import time
+
+import numpy as np
+import pandas as pd
+
+from manga_recs.common.constants import (
+    ANN_INDEX_FILENAME,
+    CLEANED_MANGA_METADATA_PARQUET,
+    CLEANED_STATUS,
+    COLLAB_INDEX_FILENAME,
+    FEATURES_STATUS,
+    MANGA_FEATURES_FILENAME,
+    MODELS_STATUS,
+    NEIGHBOR_INDEX_FILENAME,
+    USER_FEATURES_PARQUET,
+)
+from manga_recs.common.settings import settings
+from manga_recs.data.feature_matrix import FeatureMatrix, feature_files
+from manga_recs.data.load.s3 import s3_load
+from manga_recs.models.ann import IVFIndex, ann_index_files
+from manga_recs.models.neighbor_index import NeighborIndex, neighbor_index_files
+from manga_recs.serving.hybrid import HybridScorer
+from manga_recs.serving.responses import build_records
+from manga_recs.serving.title_index import TitleIndex
+from manga_recs.serving.user_profiles import UserProfiles
+from manga_recs.serving.vector_engine import VectorEngine
+
+ENGINES = ("neighbors", "vector")
+
+
+def artifact_status(engine: str) -> str:
+    """The S3 status folder whose dated prefix versions the given engine's artifacts."""
+    return FEATURES_STATUS if engine == "vector" else MODELS_STATUS
+
+
+def _record(timings: dict | None, name: str, stage: str, started: float) -> None:
+    if timings is not None:
+        timings.setdefault(name, {})[stage] = round(time.perf_counter() - started, 4)
+
+
+def load_neighbor_index(
+    filename: str = NEIGHBOR_INDEX_FILENAME,
+    bucket: str | None = None,
+    version: str | None = None,
+    timings: dict | None = None,
+) -> NeighborIndex:
+    """Fetch the neighbor index header and arrays, then memory-map them read-only.
+
+    Every worker process that opens the same local files shares a single
+    page-cache copy, so startup cost and RAM do not grow with worker count.
+    """
+    started = time.perf_counter()
+    paths = [s3_load(name, bucket=bucket, status=MODELS_STATUS, version=version) for name in neighbor_index_files(filename)]
+    _record(timings, filename, "download_s", started)
+
+    started = time.perf_counter()
+    neighbor_index = NeighborIndex.load(paths[0])
+    _record(timings, filename, "load_s", started)
+    return neighbor_index
+
+
+def load_ann_index(
+    filename: str = ANN_INDEX_FILENAME,
+    bucket: str | None = None,
+    version: str | None = None,
+    timings: dict | None = None,
+) -> IVFIndex:
+    """Fetch the IVF index written by ``train`` and memory-map its arrays."""
+    started = time.perf_counter()
+    paths = [s3_load(name, bucket=bucket, status=MODELS_STATUS, version=version) for name in ann_index_files(filename)]
+    _record(timings, filename, "download_s", started)
+
+    started = time.perf_counter()
+    ann_index = IVFIndex.load(paths[0])
+    _record(timings, filename, "load_s", started)
+    return ann_index
+
+
+def load_vector_engine(
+    metadata: pd.DataFrame,
+    bucket: str | None = None,
+    version: str | None = None,
+    timings: dict | None = None,
+    ann_version: str | None = None,
+) -> VectorEngine:
+    """Load the manga feature bundle (memory-mapped) and build the query-time scoring engine.
+
+    When ``ann.enabled`` is set the IVF index (pinned by ``ann_version``) is
+    attached, unless it was built from a different set of items than the
+    current features, in which case queries fall back to the exact scan.
+    """
+    started = time.perf_counter()
+    paths = [s3_load(name, bucket=bucket, status=FEATURES_STATUS, version=version) for name in feature_files(MANGA_FEATURES_FILENAME)]
+    _record(timings, MANGA_FEATURES_FILENAME, "download_s", started)
+
+    started = time.perf_counter()
+    features = FeatureMatrix.load(paths[0])
+    engine_version = version or features.version
+    engine = VectorEngine.from_features(features, metadata, version=f"features-{engine_version}", n_probe=settings.ann.n_probe)
+    _record(timings, MANGA_FEATURES_FILENAME, "load_s", started)
+
+    if settings.ann.enabled:
+        ann_index = load_ann_index(bucket=bucket, version=ann_version, timings=timings)
+        if np.array_equal(ann_index.ids, engine.ids):
+            engine.ann = ann_index
+        else:
+            print(f"ANN index {ann_index.version} does not match the current features; using exact search.")
+    return engine
+
+
+def load_metadata(bucket: str | None = None, version: str | None = None, timings: dict | None = None) -> pd.DataFrame:
+    started = time.perf_counter()
+    path = s3_load(CLEANED_MANGA_METADATA_PARQUET, bucket=bucket, status=CLEANED_STATUS, version=version)
+    _record(timings, CLEANED_MANGA_METADATA_PARQUET, "download_s", started)
+
+    started = time.perf_counter()
+    metadata = pd.read_parquet(path)
+    _record(timings, CLEANED_MANGA_METADATA_PARQUET, "load_s", started)
+    return metadata
+
+
+def load_user_profiles(scorer, bucket: str | None = None, version: str | None = None, timings: dict | None = None) -> UserProfiles:
+    """Load per-user interaction strengths and index them by scorer row."""
+    started = time.perf_counter()
+    path = s3_load(USER_FEATURES_PARQUET, bucket=bucket, status=FEATURES_STATUS, version=version)
+    _record(timings, USER_FEATURES_PARQUET, "download_s", started)
+
+    started = time.perf_counter()
+    user_profiles = UserProfiles.from_features(pd.read_parquet(path), scorer)
+    _record(timings, USER_FEATURES_PARQUET, "load_s", started)
+    return user_profiles
+
+
+@dataclass(frozen=True)
+class LoadedModel:
+    """Everything a request needs, loaded together so it can be swapped as one unit.
+
+    Exactly one of ``neighbor_index`` (precomputed top-K lists) or
+    ``vector_engine`` (query-time scoring with filters) is set, depending on
+    ``recommendation.engine``; ``scorer`` returns whichever is active.
+    """
+
+    metadata: pd.DataFrame
+    title_index: TitleIndex
+    neighbor_index: NeighborIndex | None = None
+    vector_engine: VectorEngine | None = None
+    hybrid: HybridScorer | None = field(default=None, repr=False)
+    records: list = field(default_factory=list, repr=False)
+    user_profiles: UserProfiles | None = field(default=None, repr=False)
+    prefix: str | None = None
+    # Dated S3 prefix each artifact was pinned to (model_version, ann_version, ...)
+    versions: dict = field(default_factory=dict)
+    timings: dict = field(default_factory=dict)
+    loaded_at: str = field(default_factory=lambda: datetime.now().strftime("%Y-%m-%dT%H:%M:%S"))
+
+    @property
+    def scorer(self) -> NeighborIndex | VectorEngine:
+        return self.vector_engine if self.vector_engine is not None else self.neighbor_index
+
+    def scorer_for(self, collaborative_weight: float | None = None):
+        """The content scorer, or a hybrid blend when a collaborative weight applies."""
+        if collaborative_weight is None:
+            collaborative_weight = settings.recommendation.collaborative_weight
+        if collaborative_weight <= 0 or self.hybrid is None:
+            return self.scorer
+        return self.hybrid.with_weight(collaborative_weight)
+
+    @property
+    def engine(self) -> str:
+        return "vector" if self.vector_engine is not None else "neighbors"
+
+    @property
+    def version(self) -> str:
+        return self.scorer.version
+
+    @property
+    def cache_version(self) -> tuple:
+        """Versions of every index a cached response depends on: content and, when loaded, collaborative."""
+        return (self.version, self.hybrid.collaborative.version if self.hybrid is not None else None)
+
+    def info(self) -> dict:
+        info = {
+            "version": self.version,
+            "engine": self.engine,
+            "prefix": self.prefix,
+            "versions": self.versions,
+            "loaded_at": self.loaded_at,
+            "num_items": len(self.scorer),
+            "num_users": len(self.user_profiles) if self.user_profiles is not None else 0,
+            "collaborative": self.hybrid.collaborative.version if self.hybrid is not None else None,
+            "timings": self.timings,
+        }
+        if self.neighbor_index is not None:
+            info["neighbor_k"] = self.neighbor_index.k
+        if self.vector_engine is not None and self.vector_engine.ann is not None:
+            info["ann"] = {
+                "version": self.vector_engine.ann.version,
+                "n_lists": self.vector_engine.ann.n_lists,
+                "n_probe": self.vector_engine.n_probe,
+            }
+        return info
+
+
+def load_model(
+    bucket: str | None = None,
+    model_version: str | None = None,
+    metadata_version: str | None = None,
+    engine: str | None = None,
+    ann_version: str | None = None,
+    user_version: str | None = None,
+    collab_version: str | None = None,
+) -> LoadedModel:
+    """Load the scoring artifacts and metadata, pinned to dated S3 prefixes when given.
+
+    ``model_version`` pins the neighbor index prefix, or the feature prefix for
+    the vector engine, and ``ann_version`` the IVF index prefix (models
+    folder), and ``user_version`` the user features prefix and ``collab_version``
+    the collaborative index prefix. Download and load times are recorded per artifact and
+    printed.
+    """
+    engine = engine or settings.recommendation.engine
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown recommendation engine '{engine}', expected one of {ENGINES}")
+
+    timings: dict = {}
+    metadata = load_metadata(bucket=bucket, version=metadata_version, timings=timings)
+
+    neighbor_index = vector_engine = None
+    if engine == "vector":
+        vector_engine = load_vector_engine(metadata, bucket=bucket, version=model_version, timings=timings, ann_version=ann_version)
+    else:
+        neighbor_index = load_neighbor_index(bucket=bucket, version=model_version, timings=timings)
+    scorer = vector_engine if vector_engine is not None else neighbor_index
+
+    if neighbor_index is not None:
+        # Build the sparse item-item graph now rather than on the first user request
+        started = time.perf_counter()
+        neighbor_index.graph
+        _record(timings, "item_graph", "build_s", started)
+    hybrid = None
+    if settings.collaborative.enabled:
+        try:
+            collab_index = load_neighbor_index(COLLAB_INDEX_FILENAME, bucket=bucket, version=collab_version, timings=timings)
+            hybrid = HybridScorer.build(scorer, collab_index, pool=settings.recommendation.neighbor_k)
+        except Exception as e:
+            # Optional artifact: keep serving content-only recommendations without it
+            print(f"Collaborative index unavailable, serving content scores only: {e}")
+
+    user_profiles = None
+    try:
+        user_profiles = load_user_profiles(scorer, bucket=bucket, version=user_version, timings=timings)
+    except Exception as e:
+        # Optional artifact: item recommendations keep serving, /users answers 503
+        print(f"User features unavailable, personalized recommendations disabled: {e}")
+
+    started = time.perf_counter()
+    title_index = TitleIndex.from_metadata(metadata, max_candidates=settings.api.fuzzy_max_candidates)
+    _record(timings, "title_index", "build_s", started)
+
+    # Response records aligned with scorer rows, so responses need no pandas
+    started = time.perf_counter()
+    records = build_records(metadata, scorer.ids)
+    _record(timings, "response_records", "build_s", started)
+
+    for name, stages in timings.items():
+        print(f"Loaded {name}: " + ", ".join(f"{stage}={seconds:.3f}" for stage, seconds in stages.items()))
+
+    return LoadedModel(
+        metadata=metadata,
+        title_index=title_index,
+        neighbor_index=neighbor_index,
+        vector_engine=vector_engine,
+        records=records,
+        hybrid=hybrid,
+        user_profiles=user_profiles,
+        prefix=model_version,
+        versions={
+            name: version
+            for name, version in {
+                "model_version": model_version,
+                "metadata_version": metadata_version,
+                "ann_version": ann_version,
+                "user_version": user_version,
+                "collab_version": collab_version,
+            }.items()
+            if version is not None
+        },
+        timings=timings,
+    )
@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, replace
+
+import numpy as np
+
+from manga_recs.models.neighbor_index import NeighborIndex
+from manga_recs.models.vectors import top_k_per_row
+
+
+@dataclass(frozen=True)
+class HybridScorer:
+    """Blend content similarity with collaborative co-occurrence per query.
+
+    Both scorers produce a candidate pool for the query; the pools are merged
+    and each candidate scores ``(1 - weight) * content + weight * collaborative``,
+    a missing side counting as 0. Items with no read history (not in the
+    collaborative index) are served from content scores alone. Rows are
+    always the content scorer's rows, so responses and records line up.
+    """
+
+    content: object
+    collaborative: NeighborIndex
+    content_to_collab: np.ndarray
+    collab_to_content: np.ndarray
+    weight: float = 0.0
+    pool: int = 50
+
+    @classmethod
+    def build(cls, content, collaborative: NeighborIndex, weight: float = 0.0, pool: int = 50) -> "HybridScorer":
+        """Precompute the row mappings between the two indexes once per loaded model."""
+        collab_rows, found = collaborative.rows_for(content.ids)
+        content_to_collab = np.where(found, collab_rows, -1)
+        content_rows, found = content.rows_for(collaborative.ids)
+        collab_to_content = np.where(found, content_rows, -1)
+        return cls(content, collaborative, content_to_collab, collab_to_content, weight=weight, pool=pool)
+
+    def with_weight(self, weight: float) -> "HybridScorer":
+        return replace(self, weight=weight)
+
+    @property
+    def ids(self) -> np.ndarray:
+        return self.content.ids
+
+    @property
+    def version(self) -> str:
+        return f"{self.content.version}+{self.collaborative.version}"
+
+    def __len__(self) -> int:
+        return len(self.content)
+
+    def row_for(self, manga_id) -> int | None:
+        return self.content.row_for(manga_id)
+
+    def rows_for(self, manga_ids) -> tuple[np.ndarray, np.ndarray]:
+        return self.content.rows_for(manga_ids)
+
+    def _content_candidates(self, row: int, pool: int, mask: np.ndarray | None):
+        if mask is None:
+            return self.content.top_n_rows(row, pool)
+        return self.content.top_n_rows(row, pool, mask)
+
+    def top_n_rows(self, row: int, top_n: int, mask: np.ndarray | None = None) -> tuple[np.ndarray, np.ndarray]:
+        """Return blended (content rows, scores) for one query row."""
+        collab_row = int(self.content_to_collab[row])
+        if self.weight <= 0 or collab_row < 0:
+            return self._content_candidates(row, top_n, mask)
+
+        pool = max(top_n, self.pool)
+        content_rows, content_scores = self._content_candidates(row, pool, mask)
+        collab_rows, collab_scores = self.collaborative.top_n_rows(collab_row, pool)
+
+        # Map co-occurrence neighbours into content rows, dropping unknown items and padding
+        collab_rows = self.collab_to_content[collab_rows]
+        keep = (collab_rows >= 0) & np.isfinite(collab_scores)
+        if mask is not None:
+            keep &= mask[np.maximum(collab_rows, 0)]
+        collab_rows, collab_scores = collab_rows[keep], collab_scores[keep]
+        if len(collab_rows) == 0:
+            return content_rows[:top_n], content_scores[:top_n]
+
+        # Merge both pools on row id and blend; each pool holds a row at most once
+        keep = np.isfinite(content_scores)
+        content_rows, content_scores = content_rows[keep], content_scores[keep]
+        candidates, positions = np.unique(np.concatenate([content_rows, collab_rows]), return_inverse=True)
+        content_part = np.zeros(len(candidates), dtype=np.float32)
+        collab_part = np.zeros(len(candidates), dtype=np.float32)
+        content_part[positions[:len(content_rows)]] = content_scores
+        collab_part[positions[len(content_rows):]] = collab_scores
+
+        blended = (1 - self.weight) * content_part + self.weight * collab_part
+        top, top_scores = top_k_per_row(blended[np.newaxis, :], top_n)
+        return candidates[top[0]], top_scores[0]
+
+    def top_n_batch(self, rows, top_n: int, mask: np.ndarray | None = None) -> tuple[np.ndarray, np.ndarray]:
+        """Blend each row in turn; rows with fewer candidates are padded with -inf."""
+        if self.weight <= 0:
+            return self.content.top_n_batch(rows, top_n) if mask is None else self.content.top_n_batch(rows, top_n, mask)
+
+        rows = np.asarray(rows, dtype=np.int64)
+        top = np.zeros((len(rows), top_n), dtype=np.int64)
+        top_scores = np.full((len(rows), top_n), -np.inf, dtype=np.float32)
+        for i, row in enumerate(rows.tolist()):
+            found, found_scores = self.top_n_rows(row, top_n, mask)
+            top[i, :len(found)] = found
+            top_scores[i, :len(found)] = found_scores
+        return top, top_scores
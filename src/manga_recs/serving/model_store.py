@@ -0,0 +1,141 @@
+from datetime import datetime
+import time
+from threading import Event, Lock, Thread
+
+from manga_recs.common.constants import CLEANED_STATUS, FEATURES_STATUS, MODELS_STATUS
+from manga_recs.common.settings import settings
+from manga_recs.data.load.s3 import get_latest_s3_file
+from manga_recs.serving.artifacts import LoadedModel, artifact_status, load_model
+
+
+def _prefix_date(prefix: str) -> datetime:
+    return datetime.strptime(prefix, "%Y-%m-%d")
+
+
+def _newer(latest: dict, current: dict) -> list[str]:
+    """Names of the pinned prefixes in ``latest`` that are newer than (or missing from) ``current``."""
+    return [
+        name for name, prefix in latest.items()
+        if name not in current or _prefix_date(prefix) > _prefix_date(current[name])
+    ]
+
+
+class ModelStore:
+    """Holds the active model and hot-swaps newer ones in from a background thread.
+
+    New versions are detected with the same dated-prefix scheme that
+    ``s3_dump`` writes and ``get_latest_s3_file`` reads. Every artifact's
+    prefix is compared, not just the engine's own, because stages publish
+    on their own schedule (features before ``train`` writes the models
+    folder). A newer prefix for any of them is downloaded into its own local folder and fully loaded off the request
+    path, then published with a single reference assignment. Requests read
+    ``store.current`` once and keep using that model until they finish.
+    """
+
+    def __init__(self, bucket: str | None = None, poll_interval: float = 0, retry_interval: float = 30):
+        self.bucket = bucket
+        self.poll_interval = poll_interval
+        self.retry_interval = retry_interval
+        self.load_error: str | None = None
+        self.status = artifact_status(settings.recommendation.engine)
+        self._current: LoadedModel | None = None
+        self._refresh_lock = Lock()
+        self._stop = Event()
+        self._thread: Thread | None = None
+
+    @property
+    def current(self) -> LoadedModel:
+        model = self._current
+        if model is None:
+            raise RuntimeError("No model has been loaded yet.")
+        return model
+
+    @property
+    def loaded(self) -> bool:
+        return self._current is not None
+
+    def _latest_versions(self, model_version: str | None = None) -> dict:
+        """Latest dated prefixes for every artifact the configured engine loads."""
+        latest = {}
+
+        def _latest(status: str) -> str:
+            # One listing per S3 folder, however many artifacts live in it
+            if status not in latest:
+                latest[status] = get_latest_s3_file(self.bucket, status)
+            return latest[status]
+
+        versions = {
+            "model_version": model_version or _latest(self.status),
+            "metadata_version": _latest(CLEANED_STATUS),
+            "user_version": _latest(FEATURES_STATUS),
+        }
+        if settings.collaborative.enabled:
+            versions["collab_version"] = _latest(MODELS_STATUS)
+        if settings.recommendation.engine == "vector" and settings.ann.enabled:
+            versions["ann_version"] = _latest(MODELS_STATUS)
+        return versions
+
+    def load(self) -> LoadedModel:
+        """Load the initial model, pinned to the latest prefixes when polling is enabled."""
+        model = None
+        if self.poll_interval > 0:
+            try:
+                model = load_model(bucket=self.bucket, **self._latest_versions())
+            except Exception as e:
+                print(f"Could not resolve the latest model prefix, using cached artifacts: {e}")
+        if model is None:
+            model = load_model(bucket=self.bucket)
+        self._current = model
+        return model
+
+    def refresh(self) -> bool:
+        """Swap in the latest model if any artifact's S3 prefix is newer. Returns True on swap."""
+        with self._refresh_lock:
+            latest = self._latest_versions()
+            current = self._current
+            newer = _newer(latest, current.versions) if current is not None else list(latest)
+            if not newer:
+                return False
+
+            print(f"Loading model versions {latest} (newer: {', '.join(newer)})...")
+            model = load_model(bucket=self.bucket, **latest)
+            self._current = model
+            print(f"Now serving model {model.version} (prefix {model.prefix})")
+            return True
+
+    def _run(self) -> None:
+        # Initial load, retried until it succeeds or the store is stopped
+        while not self.loaded and not self._stop.is_set():
+            started = time.perf_counter()
+            try:
+                model = self.load()
+                self.load_error = None
+                print(f"Model {model.version} ready in {time.perf_counter() - started:.2f}s")
+            except Exception as e:
+                self.load_error = str(e)
+                print(f"Model load failed, retrying in {self.retry_interval}s: {e}")
+                self._stop.wait(self.retry_interval)
+
+        if self.poll_interval <= 0:
+            return
+
+        while not self._stop.wait(self.poll_interval):
+            try:
+                self.refresh()
+            except Exception as e:
+                # Keep serving the current model; try again on the next poll
+                print(f"Model refresh failed: {e}")
+
+    def start(self) -> None:
+        """Load the model (if needed) and poll for newer ones, all in a background thread."""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = Thread(target=self._run, name="model-loader", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
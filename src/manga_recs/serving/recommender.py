@@ -1,60 +1,49 @@
-import pandas as pd
-import joblib
 import argparse
-from manga_recs.common.constants import (
-    CLEANED_MANGA_METADATA_PARQUET,
-    CLEANED_STATUS,
-    COSINE_SIM_FILENAME,
-    MODELS_STATUS,
-)
+from functools import lru_cache
 from manga_recs.common.settings import settings
-from manga_recs.data.load.s3 import s3_load
-
-# Paths
-MODEL_PATH = s3_load(COSINE_SIM_FILENAME, bucket=settings.s3.bucket, status=MODELS_STATUS)
-METADATA_PATH = s3_load(CLEANED_MANGA_METADATA_PARQUET, bucket=settings.s3.bucket, status=CLEANED_STATUS)
-
-# Load similarity matrix + metadata
-SIM_MATRIX = joblib.load(MODEL_PATH)
-METADATA = pd.read_parquet(METADATA_PATH)
-
-def get_top_n_recommendations_by_title(title, top_n=5):
-    """Return top-N manga recommendations given a manga title."""
-    
-    # Find manga ID from title
-    matched = METADATA[METADATA['title'].str.lower() == title.lower()]
-    if matched.empty:
-        raise ValueError(f"Title '{title}' not found in metadata.")
-    
-    manga_id = matched['id'].iloc[0]
-    
-    if manga_id not in SIM_MATRIX.index:
-        raise ValueError(f"Manga ID {manga_id} (from title '{title}') not found in similarity matrix.")
+from manga_recs.serving.artifacts import LoadedModel, load_model
+from manga_recs.serving.responses import recommendation_list
+
+
+@lru_cache(maxsize=1)
+def get_model() -> LoadedModel:
+    """Load the scoring artifacts + metadata on first use rather than at import."""
+    return load_model(bucket=settings.s3.bucket)
 
-    # Get similarity scores for this manga
-    similarities = SIM_MATRIX.loc[manga_id]
 
-    # Exclude itself and get top-N
-    top_similarities = similarities.drop(manga_id, errors='ignore').sort_values(ascending=False).head(top_n)
+def get_top_n_recommendations_by_title(title, top_n=5, collaborative_weight=None):
+    """Return top-N manga recommendations given a manga title.
 
-    # Get metadata for recommended manga
-    recs = METADATA[METADATA['id'].isin(top_similarities.index)][['id', 'title', 'description', 'tags']]
+    ``collaborative_weight`` blends in user co-occurrence scores, defaulting to
+    ``recommendation.collaborative_weight``.
+    """
+    model = get_model()
+    scorer = model.scorer_for(collaborative_weight)
+
+    # Find manga ID from title (main or alternate)
+    manga_id = model.title_index.exact_match(title)
+    if manga_id is None:
+        raise ValueError(f"Title '{title}' not found in metadata.")
 
-    # Merge similarity scores
-    recs = recs.set_index('id').join(top_similarities.rename("similarity"))
-    recs['similarity'] = recs['similarity'].round(2)
+    row = scorer.row_for(manga_id)
+    if row is None:
+        raise ValueError(f"Manga ID {manga_id} (from title '{title}') not found in {model.engine} index.")
 
-    recs = recs.sort_values(by="similarity", ascending=False)
-    return recs.reset_index().to_dict(orient='records')
+    # Get top-N neighbors (self is never a neighbor) joined with precomputed metadata records
+    rows, scores = scorer.top_n_rows(row, top_n)
+    return recommendation_list(model.records, rows, scores)
 
 
 def main():
     parser = argparse.ArgumentParser(description="Get top-N manga recommendations by title")
     parser.add_argument("--title", type=str, required=True, help="Manga title to generate recommendations for")
     parser.add_argument("--top_n", type=int, default=settings.recommendation.default_top_n, help="Number of recommendations to return")
+    parser.add_argument("--collaborative_weight", type=float, default=None, help="Blend weight for collaborative scores (0-1)")
     args = parser.parse_args()
 
-    recommendations = get_top_n_recommendations_by_title(title=args.title, top_n=args.top_n)
+    recommendations = get_top_n_recommendations_by_title(
+        title=args.title, top_n=args.top_n, collaborative_weight=args.collaborative_weight
+    )
     for rec in recommendations:
         print(rec)
 
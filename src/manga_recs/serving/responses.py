@@ -0,0 +1,61 @@
+import math
+
+import numpy as np
+import orjson
+import pandas as pd
+
+RECORD_COLUMNS = ['id', 'title', 'description', 'tags']
+
+
+def _plain(value):
+    """Convert parquet/numpy values into JSON-native Python objects."""
+    if isinstance(value, (list, tuple, np.ndarray, pd.Series)):
+        return [str(v) for v in value]
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def build_records(metadata: pd.DataFrame, ids: np.ndarray) -> list[dict | None]:
+    """Precompute one response record per row of ``ids`` (None when metadata is missing).
+
+    Done once at load time so building a response is a list index per
+    recommendation instead of a pandas filter/join per request.
+    """
+    ids = np.asarray(ids)
+    frame = metadata[RECORD_COLUMNS].drop_duplicates(subset='id').set_index('id').reindex(ids)
+    present = np.isin(ids, metadata['id'].to_numpy())
+
+    records: list[dict | None] = []
+    for manga_id, title, description, tags, has_row in zip(
+        frame.index.tolist(), frame['title'].tolist(), frame['description'].tolist(), frame['tags'].tolist(), present.tolist()
+    ):
+        if not has_row:
+            records.append(None)
+            continue
+        records.append({
+            'id': int(manga_id),
+            'title': _plain(title),
+            'description': _plain(description),
+            'tags': _plain(tags) if isinstance(tags, (list, np.ndarray)) else [],
+        })
+    return records
+
+
+def recommendation_list(records: list[dict | None], rows, scores) -> list[dict]:
+    """Build the recommendations payload from neighbor rows and their scores."""
+    recommendations = []
+    for row, score in zip(rows.tolist(), scores.tolist()):
+        if score == -math.inf:
+            # Padding for filtered queries with fewer matches than requested
+            continue
+        record = records[row]
+        if record is not None:
+            recommendations.append({**record, 'similarity': round(score, 2)})
+    return recommendations
+
+
+def dumps(payload) -> bytes:
+    return orjson.dumps(payload)
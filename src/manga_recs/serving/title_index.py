@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from typing import Iterable, NamedTuple
+import re
+
+import numpy as np
+import pandas as pd
+from rapidfuzz import fuzz, process
+
+
+class TitleMatch(NamedTuple):
+    manga_id: int
+    title: str
+    score: float
+
+
+def normalize_title(title: str) -> str:
+    """Lowercase and collapse whitespace so equivalent titles share one key."""
+    return re.sub(r"\s+", " ", title).strip().lower()
+
+
+def _ngrams(text: str, n: int) -> set[str]:
+    padded = f"{' ' * (n - 1)}{text} "
+    return {padded[i:i + n] for i in range(len(padded) - n + 1)}
+
+
+class TitleIndex:
+    """Title -> manga id lookup built once when metadata is loaded.
+
+    Exact (normalized) matches are a dict hit. Everything else goes through an
+    n-gram inverted index that narrows the catalog down to ``max_candidates``
+    titles, and only those are scored with rapidfuzz.
+    """
+
+    def __init__(self, entries: Iterable[tuple[str, int]], ngram_size: int = 3, max_candidates: int = 50):
+        self.ngram_size = ngram_size
+        self.max_candidates = max_candidates
+
+        self.exact: dict[str, int] = {}
+        self.titles: list[str] = []
+        for title, manga_id in entries:
+            if not isinstance(title, str) or not title.strip():
+                continue
+            key = normalize_title(title)
+            # First entry wins, so primary titles shadow alternate ones
+            if key not in self.exact:
+                self.exact[key] = int(manga_id)
+                self.titles.append(key)
+
+        postings = defaultdict(list)
+        gram_counts = []
+        for position, key in enumerate(self.titles):
+            grams = _ngrams(key, ngram_size)
+            gram_counts.append(len(grams))
+            for gram in grams:
+                postings[gram].append(position)
+
+        self.postings = {gram: np.asarray(rows, dtype=np.int32) for gram, rows in postings.items()}
+        self.gram_counts = np.asarray(gram_counts, dtype=np.float32)
+
+    @classmethod
+    def from_metadata(cls, metadata: pd.DataFrame, **kwargs) -> "TitleIndex":
+        """Index the primary ``title`` column, then any ``alt_titles`` lists."""
+        ids = metadata["id"].tolist()
+        entries = list(zip(metadata["title"].tolist(), ids))
+        if "alt_titles" in metadata.columns:
+            for alt_titles, manga_id in zip(metadata["alt_titles"].tolist(), ids):
+                if alt_titles is not None:
+                    entries.extend((alt, manga_id) for alt in alt_titles)
+        return cls(entries, **kwargs)
+
+    def __len__(self) -> int:
+        return len(self.titles)
+
+    def exact_match(self, query: str) -> int | None:
+        return self.exact.get(normalize_title(query))
+
+    def candidates(self, key: str) -> list[str]:
+        """Return the titles sharing the most n-grams with ``key`` (Dice overlap)."""
+        grams = _ngrams(key, self.ngram_size)
+        hits = [self.postings[gram] for gram in grams if gram in self.postings]
+        if not hits:
+            return []
+
+        shared = np.bincount(np.concatenate(hits), minlength=len(self.titles))
+        matched = np.flatnonzero(shared)
+        overlap = 2 * shared[matched] / (len(grams) + self.gram_counts[matched])
+
+        if len(matched) > self.max_candidates:
+            top = np.argpartition(-overlap, self.max_candidates - 1)[:self.max_candidates]
+            matched = matched[top]
+
+        return [self.titles[position] for position in matched]
+
+    def lookup(self, query: str, threshold: float) -> TitleMatch | None:
+        """Resolve ``query`` to a manga id, or None if nothing scores ``threshold``."""
+        key = normalize_title(query)
+        manga_id = self.exact.get(key)
+        if manga_id is not None:
+            return TitleMatch(manga_id, key, 100.0)
+
+        best_match = process.extractOne(key, self.candidates(key), scorer=fuzz.ratio, score_cutoff=threshold)
+        if best_match is None:
+            return None
+
+        matched_title, score, _ = best_match
+        return TitleMatch(self.exact[matched_title], matched_title, score)
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+from manga_recs.models.vectors import top_k_per_row
+
+
+class UserProfiles:
+    """Per-user read lists as a CSR layout over scorer rows.
+
+    ``rows[offsets[i]:offsets[i + 1]]`` are the scorer rows on the list of
+    ``user_ids[i]`` and ``weights`` their ``interaction_strength``. Users are
+    sorted by id so a lookup is a binary search.
+    """
+
+    def __init__(self, user_ids, offsets, rows, weights):
+        self.user_ids = user_ids
+        self.offsets = offsets
+        self.rows = rows
+        self.weights = weights
+
+    @classmethod
+    def from_features(cls, user_features: pd.DataFrame, scorer) -> "UserProfiles":
+        """Build from ``create_user_features`` output, keeping items the scorer knows."""
+        frame = user_features[['userId', 'mediaId', 'interaction_strength']].dropna(subset=['userId', 'mediaId'])
+        rows, found = scorer.rows_for(frame['mediaId'].to_numpy(dtype=np.int64))
+        frame = frame.assign(row=rows)[found]
+        frame = frame.drop_duplicates(subset=['userId', 'row']).sort_values(['userId', 'row'], kind='stable')
+
+        user_ids, counts = np.unique(frame['userId'].to_numpy(dtype=np.int64), return_counts=True)
+        offsets = np.zeros(len(user_ids) + 1, dtype=np.int64)
+        np.cumsum(counts, out=offsets[1:])
+
+        return cls(
+            user_ids=user_ids,
+            offsets=offsets,
+            rows=frame['row'].to_numpy(dtype=np.int64),
+            weights=frame['interaction_strength'].fillna(0).to_numpy(dtype=np.float32),
+        )
+
+    def __len__(self) -> int:
+        return len(self.user_ids)
+
+    def interactions(self, user_id) -> tuple[np.ndarray, np.ndarray] | None:
+        """Return (scorer rows, weights) on the user's list, or None for an unknown user."""
+        i = int(np.searchsorted(self.user_ids, int(user_id)))
+        if i >= len(self.user_ids) or self.user_ids[i] != int(user_id):
+            return None
+        start, end = self.offsets[i], self.offsets[i + 1]
+        return self.rows[start:end], self.weights[start:end]
+
+    def top_n_rows(self, scorer, user_id, top_n: int) -> tuple[np.ndarray, np.ndarray] | None:
+        """Return (rows, scores) of the best unread items for ``user_id``, or None if unknown.
+
+        Each candidate scores the sum of its similarity to the items on the
+        list, weighted by interaction strength; see ``scorer.user_scores``.
+        """
+        interactions = self.interactions(user_id)
+        if interactions is None:
+            return None
+        rows, weights = interactions
+
+        scores = scorer.user_scores(rows, weights)
+        scores[rows] = -np.inf  # never recommend something already on the list
+        top_n = min(top_n, int(np.isfinite(scores).sum()))
+        top, top_scores = top_k_per_row(scores[np.newaxis, :], top_n)
+        return top[0], top_scores[0]
@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+from manga_recs.data.feature_matrix import FeatureMatrix
+from manga_recs.models.vectors import dense_rows, dot_scores, item_vectors, top_k_per_row
+
+
+def _label_masks(labels: pd.Series) -> dict[str, np.ndarray]:
+    """One boolean mask per (lowercased) label found in a column of label lists."""
+    n_items = len(labels)
+    rows_by_label: dict[str, list[int]] = {}
+    for row, values in enumerate(labels.tolist()):
+        if values is None or isinstance(values, float):
+            continue
+        for value in values:
+            rows_by_label.setdefault(str(value).lower(), []).append(row)
+
+    masks = {}
+    for label, rows in rows_by_label.items():
+        mask = np.zeros(n_items, dtype=bool)
+        mask[rows] = True
+        masks[label] = mask
+    return masks
+
+
+class VectorEngine:
+    """Query-time cosine scoring over the in-memory manga feature matrix.
+
+    Rows are L2-normalized float32 vectors (CSR) sorted by manga id, so a
+    query is a single sparse matrix-vector product. Filters are precomputed boolean masks that
+    knock candidates out before the top-K selection, so no N x N artifact is
+    needed and filtered requests never post-filter a truncated list.
+
+    With an ``ann`` index attached, single queries only score the items in the
+    ``n_probe`` nearest IVF lists instead of the whole catalog.
+    """
+
+    def __init__(self, ids, vectors, finished, release_year, genre_masks, tag_masks, version: str = "", ann=None, n_probe: int = 8):
+        self.ids = ids
+        self.vectors = vectors
+        self.finished = finished
+        self.release_year = release_year
+        self.genre_masks = genre_masks
+        self.tag_masks = tag_masks
+        self.version = version
+        self.ann = ann
+        self.n_probe = n_probe
+
+    @classmethod
+    def from_features(cls, features: FeatureMatrix | pd.DataFrame, metadata: pd.DataFrame, version: str = "", **kwargs) -> "VectorEngine":
+        ids, vectors = item_vectors(features)
+
+        # Filters come from the raw (unscaled) metadata, aligned to the feature rows
+        meta = metadata.drop_duplicates(subset='id').set_index('id').reindex(ids)
+        finished = meta['has_end_date'].fillna(0).to_numpy() == 1
+        release_year = pd.to_datetime(meta['startDate']).dt.year.to_numpy(dtype=np.float32)
+
+        return cls(
+            ids=ids,
+            vectors=vectors,
+            finished=finished,
+            release_year=release_year,
+            genre_masks=_label_masks(meta['genres']),
+            tag_masks=_label_masks(meta['tags']),
+            version=version,
+            **kwargs,
+        )
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __contains__(self, manga_id) -> bool:
+        return self.row_for(manga_id) is not None
+
+    def row_for(self, manga_id) -> int | None:
+        row = int(np.searchsorted(self.ids, int(manga_id)))
+        if row < len(self.ids) and self.ids[row] == int(manga_id):
+            return row
+        return None
+
+    def rows_for(self, manga_ids) -> tuple[np.ndarray, np.ndarray]:
+        manga_ids = np.asarray(manga_ids, dtype=np.int64)
+        rows = np.minimum(np.searchsorted(self.ids, manga_ids), len(self.ids) - 1)
+        return rows, self.ids[rows] == manga_ids
+
+    def filter_mask(
+        self,
+        finished_only: bool = False,
+        genres=(),
+        tags=(),
+        min_release_year: int | None = None,
+        max_release_year: int | None = None,
+    ) -> np.ndarray | None:
+        """AND together the requested filters. Returns None when nothing is filtered.
+
+        Raises ValueError for a genre or tag that does not exist in the catalog.
+        """
+        mask = None
+
+        def _and(other):
+            return other.copy() if mask is None else mask & other
+
+        if finished_only:
+            mask = _and(self.finished)
+        for label_masks, values, kind in ((self.genre_masks, genres, "genre"), (self.tag_masks, tags, "tag")):
+            for value in values:
+                label_mask = label_masks.get(value.lower())
+                if label_mask is None:
+                    raise ValueError(f"Unknown {kind} '{value}'.")
+                mask = _and(label_mask)
+        if min_release_year is not None:
+            mask = _and(self.release_year >= min_release_year)
+        if max_release_year is not None:
+            mask = _and(self.release_year <= max_release_year)
+        return mask
+
+    def user_scores(self, rows, weights) -> np.ndarray:
+        """Sum of ``weights``-weighted cosine similarities to ``rows`` for every item.
+
+        The weighted rows collapse into one profile vector first, so this is a
+        single matrix-vector product however long the list is.
+        """
+        profile = self.vectors[np.asarray(rows, dtype=np.int64)].T @ np.asarray(weights, dtype=np.float32)
+        return self.vectors @ np.asarray(profile).ravel()
+
+    def top_n_batch(self, rows, top_n: int, mask: np.ndarray | None = None) -> tuple[np.ndarray, np.ndarray]:
+        """Score many query rows with one matrix product and select each row's top-N.
+
+        Rows with fewer than ``top_n`` allowed candidates are padded with -inf
+        scores, which callers skip.
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        if self.ann is not None:
+            top = np.zeros((len(rows), top_n), dtype=np.int64)
+            top_scores = np.full((len(rows), top_n), -np.inf, dtype=np.float32)
+            for i, row in enumerate(rows.tolist()):
+                found, found_scores = self.top_n_rows(row, top_n, mask)
+                top[i, :len(found)] = found
+                top_scores[i, :len(found)] = found_scores
+            return top, top_scores
+
+        scores = dot_scores(self.vectors[rows], self.vectors)
+        scores[np.arange(len(rows)), rows] = -np.inf  # never recommend the query itself
+        if mask is not None:
+            scores[:, ~mask] = -np.inf
+        return top_k_per_row(scores, top_n)
+
+    def top_n_rows(self, row: int, top_n: int, mask: np.ndarray | None = None) -> tuple[np.ndarray, np.ndarray]:
+        """Return (neighbor rows, scores) for one query row, honouring ``mask``."""
+        if self.ann is not None:
+            rows, top_scores = self.ann.search(self.vectors, row, top_n, self.n_probe, mask)
+            # A strict filter can empty the probed lists; fall back to the exact scan
+            if len(rows) >= top_n or mask is None:
+                return rows, top_scores
+
+        scores = self.vectors @ dense_rows(self.vectors, row)
+        scores[row] = -np.inf
+        if mask is not None:
+            scores[~mask] = -np.inf
+        top_n = min(top_n, int(np.isfinite(scores).sum()))
+        rows, top_scores = top_k_per_row(scores[np.newaxis, :], top_n)
+        return rows[0], top_scores[0]